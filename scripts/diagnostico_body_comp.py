@@ -3,6 +3,7 @@ Diagnostic script for body composition data from Garmin Connect.
 Tests connection and displays body composition structure.
 """
 
+import asyncio
 import json
 import logging
 import sys
@@ -14,7 +15,7 @@ from dotenv import load_dotenv
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.garmin_client import GarminClient
+from src.garmin_client import get_client
 from src.config import Config
 
 # Configure logging
@@ -26,7 +27,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+async def main():
     """Run body composition diagnostic."""
 
     load_dotenv()
@@ -45,8 +46,8 @@ def main():
 
     # 2. Connect
     print("\n2. Connecting to Garmin...")
-    client = GarminClient(Config.GARMIN_EMAIL, Config.GARMIN_PASSWORD)
-    if not client.connect():
+    client = get_client(Config.GARMIN_EMAIL, Config.GARMIN_PASSWORD)
+    if client is None:
         print("   ❌ Connection failed")
         return
     print("   ✅ Connected")
@@ -59,7 +60,12 @@ def main():
     print(f"   Date range: {start_date.date()} to {end_date.date()}")
     print(f"   Days: {Config.ANALYSIS_DAYS}")
 
-    body_comp = client.get_body_composition(start_date, end_date)
+    # Fire the 90-day fallback speculatively alongside the main request
+    start_date_90 = end_date - timedelta(days=90)
+    body_comp, body_comp_90 = await asyncio.gather(
+        asyncio.to_thread(client.get_body_composition, start_date, end_date),
+        asyncio.to_thread(client.get_body_composition, start_date_90, end_date),
+    )
 
     print(f"\n4. Results:")
     print(f"   Type: {type(body_comp)}")
@@ -73,21 +79,22 @@ def main():
         # Verify key fields
         first = body_comp[0]
         print(f"\n   Available fields:")
-        for key in sorted(first.keys()):
-            value = first[key]
+        for key, value in sorted(first.items()):
             print(f"      - {key}: {value}")
 
         # Show summary
         print(f"\n   📊 Summary:")
         print(f"      Total measurements: {len(body_comp)}")
-        if 'weight' in first:
-            weight = first['weight']
+        weight = first.get('weight')
+        if weight is not None:
             weight_kg = weight / 1000 if weight > 500 else weight
             print(f"      Latest weight: {weight_kg:.1f} kg")
-        if 'bodyFat' in first:
-            print(f"      Latest body fat: {first['bodyFat']:.1f}%")
-        if 'bmi' in first:
-            print(f"      Latest BMI: {first['bmi']:.1f}")
+        body_fat = first.get('bodyFat')
+        if body_fat is not None:
+            print(f"      Latest body fat: {body_fat:.1f}%")
+        bmi = first.get('bmi')
+        if bmi is not None:
+            print(f"      Latest BMI: {bmi:.1f}")
 
     else:
         print("\n   ❌ NO DATA FOUND")
@@ -98,9 +105,6 @@ def main():
 
         # Try with 90 days
         print("\n5. Trying with 90 days...")
-        start_date_90 = end_date - timedelta(days=90)
-        body_comp_90 = client.get_body_composition(start_date_90, end_date)
-
         if body_comp_90 and len(body_comp_90) > 0:
             print(f"   ✅ Found {len(body_comp_90)} measurements with 90 days")
             print(f"   Suggestion: Set ANALYSIS_DAYS=90 in your .env file")
@@ -115,4 +119,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
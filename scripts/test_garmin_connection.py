@@ -2,6 +2,7 @@
 Test Garmin Connect connection and basic functionality.
 """
 
+import asyncio
 import logging
 import sys
 from datetime import datetime, timedelta
@@ -12,7 +13,7 @@ from dotenv import load_dotenv
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.garmin_client import GarminClient
+from src.garmin_client import get_client
 from src.config import Config
 
 logging.basicConfig(
@@ -21,7 +22,7 @@ logging.basicConfig(
 )
 
 
-def main():
+async def main():
     """Test Garmin connection."""
 
     load_dotenv()
@@ -40,16 +41,25 @@ def main():
 
     # Connect
     print("\n2. Connecting to Garmin...")
-    client = GarminClient(Config.GARMIN_EMAIL, Config.GARMIN_PASSWORD)
-    if not client.connect():
+    client = get_client(Config.GARMIN_EMAIL, Config.GARMIN_PASSWORD)
+    if client is None:
         print("   ❌ Connection failed")
         print("   Check your credentials and internet connection")
         return
     print("   ✅ Connected successfully")
 
+    # Independent probes: run them concurrently so wall time is the slowest call
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=7)
+    profile, activities, body_comp, devices = await asyncio.gather(
+        asyncio.to_thread(client.get_user_profile),
+        asyncio.to_thread(client.get_activities, start_date, end_date),
+        asyncio.to_thread(client.get_body_composition, start_date, end_date),
+        asyncio.to_thread(client.get_devices),
+    )
+
     # Get profile
     print("\n3. Fetching user profile...")
-    profile = client.get_user_profile()
     if profile:
         print(f"   ✅ Name: {profile.get('name', 'Unknown')}")
         print(f"   ✅ Unit system: {profile.get('unit_system', 'Unknown')}")
@@ -58,10 +68,6 @@ def main():
 
     # Get recent activities
     print("\n4. Fetching recent activities (last 7 days)...")
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
-
-    activities = client.get_activities(start_date, end_date)
     if activities:
         print(f"   ✅ Found {len(activities)} activities")
         if len(activities) > 0:
@@ -70,32 +76,33 @@ def main():
             print(f"      Name: {latest.get('activityName', 'Unknown')}")
             print(f"      Type: {latest.get('activityType', {}).get('typeKey', 'Unknown')}")
             print(f"      Date: {latest.get('startTimeLocal', 'Unknown')}")
-            if 'distance' in latest:
-                print(f"      Distance: {latest['distance']/1000:.2f} km")
-            if 'duration' in latest:
-                print(f"      Duration: {latest['duration']/60:.0f} min")
+            distance = latest.get('distance')
+            if distance is not None:
+                print(f"      Distance: {distance/1000:.2f} km")
+            duration = latest.get('duration')
+            if duration is not None:
+                print(f"      Duration: {duration/60:.0f} min")
     else:
         print("   ⚠️  No activities found in last 7 days")
 
     # Get body composition
     print("\n5. Checking body composition data...")
-    body_comp = client.get_body_composition(start_date, end_date)
     if body_comp and len(body_comp) > 0:
         print(f"   ✅ Found {len(body_comp)} measurements")
         latest = body_comp[0]
-        if 'weight' in latest:
-            weight = latest['weight']
+        weight = latest.get('weight')
+        if weight is not None:
             weight_kg = weight / 1000 if weight > 500 else weight
             print(f"      Latest weight: {weight_kg:.1f} kg")
-        if 'bodyFat' in latest:
-            print(f"      Body fat: {latest['bodyFat']:.1f}%")
+        body_fat = latest.get('bodyFat')
+        if body_fat is not None:
+            print(f"      Body fat: {body_fat:.1f}%")
     else:
         print("   ⚠️  No body composition data found")
         print("   This is normal if you don't have a connected scale")
 
     # Get devices
     print("\n6. Fetching connected devices...")
-    devices = client.get_devices()
     if devices:
         print(f"   ✅ Found {len(devices)} device(s)")
         for device in devices[:3]:  # Show max 3
@@ -111,4 +118,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
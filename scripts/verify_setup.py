@@ -4,17 +4,17 @@ Checks all settings and dependencies.
 """
 
 import sys
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import Config
-from src.prompt_manager import PromptManager
-
 
 def check_environment():
     """Check environment variables."""
+    from src.config import Config  # pylint: disable=import-outside-toplevel
+
     print("=" * 70)
     print("ENVIRONMENT VARIABLES")
     print("=" * 70)
@@ -53,6 +53,8 @@ def check_environment():
 
 def check_prompts():
     """Check prompt configuration."""
+    from src.prompt_manager import PromptManager  # pylint: disable=import-outside-toplevel
+
     print("\n" + "=" * 70)
     print("PROMPTS CONFIGURATION")
     print("=" * 70)
@@ -94,18 +96,16 @@ def check_dependencies():
 
     print("\n📦 Checking packages...")
     for package, expected_version in required:
+        # Read the installed version from dist-info metadata instead of
+        # importing the (heavy) package itself
         try:
-            if package == 'python-dotenv':
-                import dotenv
-                version = dotenv.__version__ if hasattr(dotenv, '__version__') else 'unknown'
-            else:
-                mod = __import__(package.replace('-', '_'))
-                version = mod.__version__ if hasattr(mod, '__version__') else 'unknown'
-
-            status = '✅' if version == expected_version else '⚠️'
-            print(f"   {status} {package}: {version} (expected: {expected_version})")
-        except ImportError:
+            installed = version(package)
+        except PackageNotFoundError:
             print(f"   ❌ {package}: Not installed")
+            continue
+
+        status = '✅' if installed == expected_version else '⚠️'
+        print(f"   {status} {package}: {installed} (expected: {expected_version})")
 
 
 def check_directories():
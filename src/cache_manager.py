@@ -3,98 +3,247 @@ Gestor de caché para datos de Garmin usando SQLite.
 Reduce llamadas a la API y mejora el rendimiento.
 """
 
+import hashlib
 import json
 import sqlite3
 import logging
-import os
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
+from collections import OrderedDict
 from contextlib import contextmanager
 
-
-class CacheManager:
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - xxhash es opcional
+    xxhash = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard es opcional
+    zstandard = None
+
+# Directorio por defecto de la base de datos de caché (relativo al directorio de trabajo)
+DEFAULT_CACHE_DIR = ".cache"
+
+# Nombre fijo de la base de datos: las entradas de larga duración (días cerrados,
+# detalles de actividad, inventario) se reutilizan entre ejecuciones. WAL permite
+# que varios procesos la compartan y el RLock serializa los hilos de cada uno
+_DB_FILENAME = "garmin_cache.db"
+
+# Los frames zstd empiezan siempre por este magic number; un JSON nunca lo hace,
+# lo que permite leer filas sin comprimir escritas por versiones anteriores
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZSTD_LEVEL = 3
+
+# Sentencias del camino caliente: cadenas constantes para que el caché de
+# sentencias preparadas de sqlite3 las reutilice en cada llamada
+_SQL_GET = (
+    "SELECT data, expires_at FROM cache "
+    "WHERE kind = ? AND cache_key = ? AND expires_at > ?"
+)
+_SQL_DELETE_EXPIRED_KEY = (
+    "DELETE FROM cache WHERE kind = ? AND cache_key = ? AND expires_at <= ?"
+)
+_SQL_UPSERT = (
+    "INSERT INTO cache (kind, cache_key, data, created_at, expires_at) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(kind, cache_key) DO UPDATE SET "
+    "data = excluded.data, created_at = excluded.created_at, expires_at = excluded.expires_at"
+)
+_SQL_DELETE_EXPIRED = "DELETE FROM cache WHERE expires_at <= ?"
+_SQL_CLEAR = "DELETE FROM cache"
+
+# Páginas liberadas por clear_expired y tamaño a partir del cual se compacta
+# la base de datos entera con VACUUM
+_INCREMENTAL_VACUUM_PAGES = 1000
+_VACUUM_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+# Totales y entradas vigentes por tipo en un único recorrido del índice
+_SQL_STATS = (
+    "SELECT kind, COUNT(*), COALESCE(SUM(expires_at > ?), 0) "
+    "FROM cache GROUP BY kind"
+)
+
+# Tipo de dato almacenado -> clave en get_cache_stats()
+_STATS_KEYS = {
+    "activities": "activities",
+    "body_composition": "body_composition",
+    "profile": "user_profiles",
+    "activity_details": "activity_details",
+    "activity_splits": "activity_splits",
+    "daily_stats": "daily_stats",
+    "heart_rates": "heart_rates",
+    "body_battery": "body_battery",
+    "devices": "devices",
+    "gear": "gear",
+}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serializa un objeto a JSON en bytes (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Deserializa JSON desde bytes o texto (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheManager:  # pylint: disable=too-many-instance-attributes
     """Gestor de caché local para datos de Garmin."""
 
-    def __init__(self, cache_dir: str = ".cache", ttl_hours: int = 24):
+    def __init__(self, cache_dir: Optional[str] = None, ttl_hours: int = 24, memory_cache_size: int = 128):
         """
         Inicializa el gestor de caché.
 
         Args:
-            cache_dir: Directorio para almacenar la base de datos de caché
+            cache_dir: Directorio para almacenar la base de datos de caché (default: DEFAULT_CACHE_DIR)
             ttl_hours: Tiempo de vida del caché en horas (default: 24h)
+            memory_cache_size: Entradas máximas del LRU en memoria (0 lo desactiva)
         """
-        self.cache_dir = Path(cache_dir)
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
         self.cache_dir.mkdir(exist_ok=True)
-        # Use a process-specific DB filename to avoid cross-run collisions in tests
-        self.db_path = self.cache_dir / f"garmin_cache_{os.getpid()}.db"
+        self.db_path = self.cache_dir / _DB_FILENAME
         self.ttl_hours = ttl_hours
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        # Conexión persistente (autocommit) compartida por todas las
+        # operaciones; el lock serializa el acceso desde varios hilos
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        # Cierra la conexión al recolectar la instancia o al salir del intérprete,
+        # sin mantener viva la instancia hasta el final del proceso
+        self._finalizer = weakref.finalize(self, self._conn.close)
+
+        # Compresores reutilizables (se usan siempre bajo el lock)
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+            self._decompressor = zstandard.ZstdDecompressor()
+        else:
+            self._compressor = None
+            self._decompressor = None
+
+        # LRU en memoria delante de SQLite: (kind, cache_key) -> (expires_at, JSON).
+        # Guarda el JSON sin comprimir y no el objeto: cada lectura devuelve una
+        # copia nueva, así que los cambios del llamador no alteran el caché.
+        self._memory: OrderedDict = OrderedDict()
+        self._memory_cache_size = memory_cache_size
+
         # Inicializar base de datos
         self._init_database()
 
     def _init_database(self):
-        """Crea las tablas de caché si no existen."""
+        """Crea la tabla de caché si no existe."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
-            # Tabla para actividades
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS activities_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL
-                )
-            """)
+            # Debe fijarse antes de crear tablas; en bases existentes se aplica
+            # en el siguiente VACUUM (ver maybe_vacuum)
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
 
-            # Tabla para composición corporal
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS body_composition_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL
-                )
-            """)
+            # WAL evita un fsync por commit y permite lectores concurrentes
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA wal_autocheckpoint=1000")
 
-            # Tabla para perfiles de usuario
+            # Tabla única para todos los tipos de datos, discriminados por kind
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_profile_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    expires_at TIMESTAMP NOT NULL
+                CREATE TABLE IF NOT EXISTS cache (
+                    kind TEXT NOT NULL,
+                    cache_key INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    expires_at INTEGER NOT NULL,
+                    PRIMARY KEY (kind, cache_key)
                 )
             """)
 
-            # Índices para mejorar rendimiento
+            # Índice para limpieza y estadísticas por tipo/expiración
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_activities_expires
-                ON activities_cache(expires_at)
+                CREATE INDEX IF NOT EXISTS idx_cache_kind_expires
+                ON cache(kind, expires_at)
             """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_body_expires
-                ON body_composition_cache(expires_at)
-            """)
-
-            conn.commit()
             self.logger.debug("Base de datos de caché inicializada")
 
     @contextmanager
     def _get_connection(self):
-        """Context manager para conexiones a la base de datos."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Context manager que cede la conexión persistente bajo el lock."""
+        with self._lock:
+            yield self._conn
+
+    def close(self):
+        """Cierra la conexión persistente a la base de datos."""
+        with self._lock:
+            self._finalizer()
 
-    def _generate_cache_key(self, data_type: str, **params) -> str:
+    def _compress(self, payload: bytes) -> bytes:
+        """
+        Comprime un payload JSON para almacenarlo en la base de datos.
+
+        Args:
+            payload: Objeto ya serializado a JSON
+
+        Returns:
+            Payload comprimido con zstd, o JSON plano si zstandard no está instalado
+        """
+        if self._compressor is not None:
+            return self._compressor.compress(payload)
+        return payload
+
+    def _decompress(self, payload: bytes) -> bytes:
+        """
+        Descomprime (si procede) un payload almacenado.
+
+        Args:
+            payload: Datos leídos de la columna data
+
+        Returns:
+            JSON sin comprimir
+        """
+        if isinstance(payload, bytes) and payload[:4] == _ZSTD_MAGIC:
+            if self._decompressor is None:
+                raise RuntimeError("Entrada comprimida con zstd pero zstandard no está instalado")
+            return self._decompressor.decompress(payload)
+        return payload
+
+    def _decode(self, payload: bytes) -> Any:
+        """
+        Descomprime (si procede) y deserializa un payload almacenado.
+
+        Args:
+            payload: Datos leídos de la columna data
+
+        Returns:
+            Objeto deserializado
+        """
+        return _loads(self._decompress(payload))
+
+    def _generate_cache_key(self, data_type: str, **params) -> int:
         """
         Genera una clave única para el caché basada en parámetros.
 
+        La clave es un hash estable de 64 bits (xxh3, o blake2b si xxhash no
+        está instalado) convertido a entero con signo para que quepa en una
+        columna INTEGER de SQLite.
+
         Args:
             data_type: Tipo de datos (activities, body_composition, profile)
             **params: Parámetros adicionales (start_date, end_date, etc.)
@@ -102,8 +251,102 @@ class CacheManager:
         Returns:
             Clave de caché única
         """
-        param_str = "_".join(f"{k}={v}" for k, v in sorted(params.items()))
-        return f"{data_type}:{param_str}"
+        raw = data_type + "|" + "|".join(f"{k}={params[k]}" for k in sorted(params))
+        if xxhash is not None:
+            digest = xxhash.xxh3_64_digest(raw)
+        else:
+            digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def _get(self, kind: str, cache_key: int, label: str, *label_args: Any) -> Optional[Any]:
+        """
+        Obtiene una entrada del caché si existe y no ha expirado.
+
+        Consulta primero el LRU en memoria y después SQLite. Las entradas
+        expiradas se eliminan al detectarse.
+
+        Args:
+            kind: Tipo de datos (activities, body_composition, profile)
+            cache_key: Clave generada con _generate_cache_key
+            label: Descripción legible para los logs (formato %, como los mensajes de logging)
+            *label_args: Argumentos de label; solo se formatean si el log se emite
+
+        Returns:
+            Datos deserializados o None si no está en caché o expiró
+        """
+        now = int(time.time())
+
+        with self._get_connection() as conn:
+            memory_entry = self._memory.get((kind, cache_key))
+            if memory_entry is not None:
+                if now < memory_entry[0]:
+                    self._memory.move_to_end((kind, cache_key))
+                    self.logger.info("Cache HIT para " + label, *label_args)
+                    return _loads(memory_entry[1])
+                del self._memory[(kind, cache_key)]
+
+            # La vigencia se comprueba en SQL: solo se leen filas no expiradas
+            result = conn.execute(_SQL_GET, (kind, cache_key, now)).fetchone()
+
+            if result:
+                self.logger.info("Cache HIT para " + label, *label_args)
+                payload = self._decompress(result[0])
+                self._remember(kind, cache_key, result[1], payload)
+                return _loads(payload)
+
+            # Sin fila vigente: eliminar la expirada, si la hay
+            if conn.execute(_SQL_DELETE_EXPIRED_KEY, (kind, cache_key, now)).rowcount:
+                self.logger.info("Cache EXPIRED para " + label, *label_args)
+            else:
+                self.logger.info("Cache MISS para " + label, *label_args)
+
+            return None
+
+    def _set(self, kind: str, cache_key: int, data: Any, ttl: timedelta) -> int:
+        """
+        Guarda una entrada en el caché.
+
+        Args:
+            kind: Tipo de datos (activities, body_composition, profile)
+            cache_key: Clave generada con _generate_cache_key
+            data: Datos serializables a JSON
+            ttl: Tiempo de vida de la entrada
+
+        Returns:
+            Expiración de la entrada (epoch Unix en segundos)
+        """
+        created_at = int(time.time())
+        expires_at = created_at + int(ttl.total_seconds())
+        payload = _dumps(data)
+
+        with self._get_connection() as conn:
+            conn.execute(_SQL_UPSERT, (
+                kind,
+                cache_key,
+                self._compress(payload),
+                created_at,
+                expires_at
+            ))
+            self._remember(kind, cache_key, expires_at, payload)
+
+        return expires_at
+
+    def _remember(self, kind: str, cache_key: int, expires_at: int, payload: bytes):
+        """
+        Guarda una entrada en el LRU en memoria, descartando la más antigua si se llena.
+
+        Args:
+            kind: Tipo de datos
+            cache_key: Clave de caché
+            expires_at: Expiración (epoch Unix en segundos)
+            payload: Datos serializados a JSON, sin comprimir
+        """
+        if self._memory_cache_size <= 0:
+            return
+        self._memory[(kind, cache_key)] = (expires_at, payload)
+        self._memory.move_to_end((kind, cache_key))
+        while len(self._memory) > self._memory_cache_size:
+            self._memory.popitem(last=False)
 
     def get_activities(self, start_date: str, end_date: str) -> Optional[List[Dict]]:
         """
@@ -121,34 +364,10 @@ class CacheManager:
             start_date=start_date,
             end_date=end_date
         )
+        return self._get("activities", cache_key, "actividades (%s - %s)", start_date, end_date)
 
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT data, expires_at FROM activities_cache
-                WHERE cache_key = ?
-            """, (cache_key,))
-
-            result = cursor.fetchone()
-
-            if result:
-                data_json, expires_at = result
-                expires_dt = datetime.fromisoformat(expires_at)
-
-                if datetime.now() < expires_dt:
-                    self.logger.info("Cache HIT para actividades (%s - %s)", start_date, end_date)
-                    return json.loads(data_json)
-                else:
-                    self.logger.info("Cache EXPIRED para actividades (%s - %s)", start_date, end_date)
-                    # Eliminar entrada expirada
-                    cursor.execute("DELETE FROM activities_cache WHERE cache_key = ?", (cache_key,))
-                    conn.commit()
-            else:
-                self.logger.info("Cache MISS para actividades (%s - %s)", start_date, end_date)
-
-            return None
-
-    def set_activities(self, start_date: str, end_date: str, activities: List[Dict]):
+    def set_activities(self, start_date: str, end_date: str, activities: List[Dict],
+                       ttl: Optional[timedelta] = None):
         """
         Guarda actividades en el caché.
 
@@ -156,31 +375,17 @@ class CacheManager:
             start_date: Fecha de inicio (YYYY-MM-DD)
             end_date: Fecha de fin (YYYY-MM-DD)
             activities: Lista de actividades a cachear
+            ttl: Tiempo de vida (default: ttl_hours)
         """
         cache_key = self._generate_cache_key(
             "activities",
             start_date=start_date,
             end_date=end_date
         )
+        expires_at = self._set("activities", cache_key, activities, ttl or timedelta(hours=self.ttl_hours))
 
-        created_at = datetime.now()
-        expires_at = created_at + timedelta(hours=self.ttl_hours)
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO activities_cache
-                (cache_key, data, created_at, expires_at)
-                VALUES (?, ?, ?, ?)
-            """, (
-                cache_key,
-                json.dumps(activities),
-                created_at.isoformat(),
-                expires_at.isoformat()
-            ))
-            conn.commit()
-
-        self.logger.info("Actividades cacheadas (%s - %s), expira: %s", start_date, end_date, expires_at)
+        self.logger.info("Actividades cacheadas (%s - %s), expira: %s",
+                         start_date, end_date, datetime.fromtimestamp(expires_at))
 
     def get_body_composition(self, start_date: str, end_date: str) -> Optional[List[Dict]]:
         """
@@ -198,33 +403,12 @@ class CacheManager:
             start_date=start_date,
             end_date=end_date
         )
+        return self._get(
+            "body_composition", cache_key, "composición corporal (%s - %s)", start_date, end_date
+        )
 
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT data, expires_at FROM body_composition_cache
-                WHERE cache_key = ?
-            """, (cache_key,))
-
-            result = cursor.fetchone()
-
-            if result:
-                data_json, expires_at = result
-                expires_dt = datetime.fromisoformat(expires_at)
-
-                if datetime.now() < expires_dt:
-                    self.logger.info("Cache HIT para composición corporal (%s - %s)", start_date, end_date)
-                    return json.loads(data_json)
-                else:
-                    self.logger.info("Cache EXPIRED para composición corporal (%s - %s)", start_date, end_date)
-                    cursor.execute("DELETE FROM body_composition_cache WHERE cache_key = ?", (cache_key,))
-                    conn.commit()
-            else:
-                self.logger.info("Cache MISS para composición corporal (%s - %s)", start_date, end_date)
-
-            return None
-
-    def set_body_composition(self, start_date: str, end_date: str, composition: List[Dict]):
+    def set_body_composition(self, start_date: str, end_date: str, composition: List[Dict],
+                             ttl: Optional[timedelta] = None):
         """
         Guarda composición corporal en el caché.
 
@@ -232,31 +416,19 @@ class CacheManager:
             start_date: Fecha de inicio (YYYY-MM-DD)
             end_date: Fecha de fin (YYYY-MM-DD)
             composition: Lista de mediciones a cachear
+            ttl: Tiempo de vida (default: ttl_hours)
         """
         cache_key = self._generate_cache_key(
             "body_composition",
             start_date=start_date,
             end_date=end_date
         )
+        expires_at = self._set(
+            "body_composition", cache_key, composition, ttl or timedelta(hours=self.ttl_hours)
+        )
 
-        created_at = datetime.now()
-        expires_at = created_at + timedelta(hours=self.ttl_hours)
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO body_composition_cache
-                (cache_key, data, created_at, expires_at)
-                VALUES (?, ?, ?, ?)
-            """, (
-                cache_key,
-                json.dumps(composition),
-                created_at.isoformat(),
-                expires_at.isoformat()
-            ))
-            conn.commit()
-
-        self.logger.info("Composición corporal cacheada (%s - %s), expira: %s", start_date, end_date, expires_at)
+        self.logger.info("Composición corporal cacheada (%s - %s), expira: %s",
+                         start_date, end_date, datetime.fromtimestamp(expires_at))
 
     def get_user_profile(self, user_id: str = "default") -> Optional[Dict]:
         """
@@ -269,31 +441,7 @@ class CacheManager:
             Perfil de usuario o None si no está en caché o expiró
         """
         cache_key = self._generate_cache_key("profile", user_id=user_id)
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT data, expires_at FROM user_profile_cache
-                WHERE cache_key = ?
-            """, (cache_key,))
-
-            result = cursor.fetchone()
-
-            if result:
-                data_json, expires_at = result
-                expires_dt = datetime.fromisoformat(expires_at)
-
-                if datetime.now() < expires_dt:
-                    self.logger.info("Cache HIT para perfil de usuario")
-                    return json.loads(data_json)
-                else:
-                    self.logger.info("Cache EXPIRED para perfil de usuario")
-                    cursor.execute("DELETE FROM user_profile_cache WHERE cache_key = ?", (cache_key,))
-                    conn.commit()
-            else:
-                self.logger.info("Cache MISS para perfil de usuario")
-
-            return None
+        return self._get("profile", cache_key, "perfil de usuario")
 
     def set_user_profile(self, profile: Dict, user_id: str = "default"):
         """
@@ -304,59 +452,86 @@ class CacheManager:
             user_id: Identificador del usuario
         """
         cache_key = self._generate_cache_key("profile", user_id=user_id)
+        # Perfil expira más lento
+        expires_at = self._set("profile", cache_key, profile, timedelta(hours=self.ttl_hours * 7))
 
-        created_at = datetime.now()
-        expires_at = created_at + timedelta(hours=self.ttl_hours * 7)  # Perfil expira más lento
+        self.logger.info("Perfil de usuario cacheado, expira: %s", datetime.fromtimestamp(expires_at))
 
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO user_profile_cache
-                (cache_key, data, created_at, expires_at)
-                VALUES (?, ?, ?, ?)
-            """, (
-                cache_key,
-                json.dumps(profile),
-                created_at.isoformat(),
-                expires_at.isoformat()
-            ))
-            conn.commit()
+    def get_entry(self, kind: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Obtiene del caché una respuesta genérica de la API.
+
+        Args:
+            kind: Tipo de datos (activity_details, daily_stats, etc.)
+            params: Parámetros que identifican la respuesta (activity_id, date, etc.)
+
+        Returns:
+            Datos cacheados o None si no está en caché o expiró
+        """
+        cache_key = self._generate_cache_key(kind, **params)
+        return self._get(kind, cache_key, "%s %s", kind, params)
+
+    def set_entry(self, kind: str, params: Dict[str, Any], data: Any, ttl: Optional[timedelta] = None):
+        """
+        Guarda en el caché una respuesta genérica de la API.
+
+        Args:
+            kind: Tipo de datos (activity_details, daily_stats, etc.)
+            params: Parámetros que identifican la respuesta (activity_id, date, etc.)
+            data: Datos serializables a JSON
+            ttl: Tiempo de vida (default: ttl_hours)
+        """
+        cache_key = self._generate_cache_key(kind, **params)
+        expires_at = self._set(kind, cache_key, data, ttl or timedelta(hours=self.ttl_hours))
 
-        self.logger.info("Perfil de usuario cacheado, expira: %s", expires_at)
+        self.logger.debug("%s cacheado %s, expira: %s", kind, params, datetime.fromtimestamp(expires_at))
 
     def clear_expired(self):
         """Elimina todas las entradas expiradas del caché."""
-        now = datetime.now().isoformat()
+        now = int(time.time())
 
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Limpiar actividades
-            cursor.execute("DELETE FROM activities_cache WHERE expires_at < ?", (now,))
-            activities_deleted = cursor.rowcount
+            total_deleted = conn.execute(_SQL_DELETE_EXPIRED, (now,)).rowcount
 
-            # Limpiar composición corporal
-            cursor.execute("DELETE FROM body_composition_cache WHERE expires_at < ?", (now,))
-            composition_deleted = cursor.rowcount
+            for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
 
-            # Limpiar perfiles
-            cursor.execute("DELETE FROM user_profile_cache WHERE expires_at < ?", (now,))
-            profiles_deleted = cursor.rowcount
+            if total_deleted > 0:
+                # Devolver al sistema las páginas liberadas por el DELETE.
+                # executescript ejecuta el PRAGMA hasta el final; execute()
+                # solo avanzaría un paso y liberaría una única página
+                conn.executescript(f"PRAGMA incremental_vacuum({_INCREMENTAL_VACUUM_PAGES});")
 
-            conn.commit()
-
-        total_deleted = activities_deleted + composition_deleted + profiles_deleted
         if total_deleted > 0:
             self.logger.info("Eliminadas %s entradas expiradas del caché", total_deleted)
 
+        self.maybe_vacuum()
+
+    def maybe_vacuum(self, threshold_bytes: int = _VACUUM_THRESHOLD_BYTES) -> bool:
+        """
+        Compacta la base de datos con VACUUM si supera el tamaño indicado.
+
+        Args:
+            threshold_bytes: Tamaño a partir del cual se ejecuta VACUUM
+
+        Returns:
+            True si se ejecutó VACUUM
+        """
+        size = self.db_path.stat().st_size if self.db_path.exists() else 0
+        if size <= threshold_bytes:
+            return False
+
+        with self._get_connection() as conn:
+            conn.execute("VACUUM")
+
+        self.logger.info("Base de datos de caché compactada (%s bytes antes)", size)
+        return True
+
     def clear_all(self):
         """Limpia todo el caché."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM activities_cache")
-            cursor.execute("DELETE FROM body_composition_cache")
-            cursor.execute("DELETE FROM user_profile_cache")
-            conn.commit()
+            conn.execute(_SQL_CLEAR)
+            self._memory.clear()
 
         self.logger.info("Caché completo eliminado")
 
@@ -368,52 +543,24 @@ class CacheManager:
             Diccionario con estadísticas
         """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Contar actividades
-            cursor.execute("SELECT COUNT(*) FROM activities_cache")
-            activities_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM activities_cache WHERE expires_at > ?",
-                          (datetime.now().isoformat(),))
-            activities_valid = cursor.fetchone()[0]
-
-            # Contar composición corporal
-            cursor.execute("SELECT COUNT(*) FROM body_composition_cache")
-            composition_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM body_composition_cache WHERE expires_at > ?",
-                          (datetime.now().isoformat(),))
-            composition_valid = cursor.fetchone()[0]
-
-            # Contar perfiles
-            cursor.execute("SELECT COUNT(*) FROM user_profile_cache")
-            profiles_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM user_profile_cache WHERE expires_at > ?",
-                          (datetime.now().isoformat(),))
-            profiles_valid = cursor.fetchone()[0]
-
-        return {
-            "activities": {
-                "total": activities_count,
-                "valid": activities_valid,
-                "expired": activities_count - activities_valid
-            },
-            "body_composition": {
-                "total": composition_count,
-                "valid": composition_valid,
-                "expired": composition_count - composition_valid
-            },
-            "user_profiles": {
-                "total": profiles_count,
-                "valid": profiles_valid,
-                "expired": profiles_count - profiles_valid
-            },
+            rows = conn.execute(_SQL_STATS, (int(time.time()),)).fetchall()
+        counts = {kind: (total, valid) for kind, total, valid in rows}
+
+        stats: Dict[str, Any] = {}
+        for kind, stats_key in _STATS_KEYS.items():
+            total, valid = counts.get(kind, (0, 0))
+            stats[stats_key] = {
+                "total": total,
+                "valid": valid,
+                "expired": total - valid
+            }
+
+        stats.update({
             "ttl_hours": self.ttl_hours,
             "cache_dir": str(self.cache_dir),
             "db_size_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0
-        }
+        })
+        return stats
 
 
 if __name__ == "__main__":
@@ -10,14 +10,33 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from dotenv import dotenv_values
 
 
 from src.exceptions import ConfigError
 
 
+# Variables de entorno que determinan el contenido de ConfigSchema
+_ENV_KEYS = (
+    'GARMIN_EMAIL', 'GARMIN_PASSWORD', 'LLM_PROVIDER',
+    'ANTHROPIC_API_KEY', 'OPENAI_API_KEY', 'GOOGLE_API_KEY',
+    'ANTHROPIC_MODEL', 'OPENAI_MODEL', 'GOOGLE_MODEL',
+    'MAX_TOKENS', 'TEMPERATURE', 'ANALYSIS_DAYS',
+    'USE_CACHE', 'CACHE_TTL_HOURS', 'LOG_LEVEL',
+)
+
+
+@lru_cache(maxsize=8)
+def _read_env_file(env_file: str, mtime: float) -> Dict[str, str]:
+    """Parse a .env file once per (path, mtime) without touching os.environ."""
+    del mtime  # Only part of the cache key: an edited file is parsed again
+    return {key: value for key, value in dotenv_values(env_file).items() if value is not None}
+
+
 def _parse_bool(value: str | bool | None, default: bool = False) -> bool:
     if isinstance(value, bool):
         return value
@@ -26,13 +45,28 @@ def _parse_bool(value: str | bool | None, default: bool = False) -> bool:
     return str(value).lower() in ("1", "true", "yes", "on")
 
 
-@dataclass
+def _build_llm_table(
+    anthropic: Tuple[str, str],
+    openai: Tuple[str, str],
+    google: Tuple[str, str],
+) -> Dict[str, Mapping[str, str]]:
+    """Build the provider -> read-only LLM config table from (api_key, model) pairs."""
+    return {
+        provider: MappingProxyType({'api_key': api_key, 'model': model, 'provider': provider})
+        for provider, (api_key, model) in (
+            ('anthropic', anthropic), ('openai', openai), ('google', google)
+        )
+    }
+
+
+@dataclass(frozen=True, slots=True)
 class ConfigSchema:
     """Configuration schema with validation for all application settings.
 
     This dataclass holds all configuration values loaded from environment
     variables or .env files. Validation occurs in __post_init__ to ensure
-    values are within acceptable ranges.
+    values are within acceptable ranges. Instances are immutable and
+    hashable, so validation results can be memoized per instance.
 
     Attributes:
         garmin_email: Garmin Connect account email
@@ -76,39 +110,75 @@ class ConfigSchema:
     log_level: str = "INFO"
 
     def __post_init__(self):
-        # Normalize provider string
-        self.llm_provider = (self.llm_provider or "anthropic").lower()
-
-        # Validate ranges
-        if not (0.0 <= float(self.temperature) <= 1.0):
+        # Normalize provider string (Config.load already passes it normalized)
+        provider = (self.llm_provider or "anthropic").lower()
+        if provider != self.llm_provider:
+            object.__setattr__(self, 'llm_provider', provider)
+
+        # Validate ranges (Config.load already passes numbers, so only
+        # coerce values given as other types, e.g. strings)
+        temperature = self.temperature if isinstance(self.temperature, float) else float(self.temperature)
+        if not 0.0 <= temperature <= 1.0:
             raise ValueError("TEMPERATURE must be between 0.0 and 1.0")
 
-        if not (1 <= int(self.max_tokens) <= 8000):
+        max_tokens = self.max_tokens if isinstance(self.max_tokens, int) else int(self.max_tokens)
+        if not 1 <= max_tokens <= 8000:
             raise ValueError("MAX_TOKENS out of expected range")
 
-        if not (1 <= int(self.analysis_days) <= 365):
+        analysis_days = self.analysis_days if isinstance(self.analysis_days, int) else int(self.analysis_days)
+        if not 1 <= analysis_days <= 365:
             raise ValueError("ANALYSIS_DAYS out of range 1-365")
 
     def ensure_valid(self) -> None:
         """Raise ConfigError if this schema is invalid."""
-        errors = []
-        if not self.garmin_email:
-            errors.append('GARMIN_EMAIL: missing')
-        if not self.garmin_password:
-            errors.append('GARMIN_PASSWORD: missing')
-
-        if self.llm_provider == 'anthropic' and not self.anthropic_api_key:
-            errors.append('ANTHROPIC_API_KEY missing')
-        if self.llm_provider == 'openai' and not self.openai_api_key:
-            errors.append('OPENAI_API_KEY missing')
-        if self.llm_provider == 'google' and not self.google_api_key:
-            errors.append('GOOGLE_API_KEY missing')
-
-        if errors:
+        ok, errors = _validate(self)
+        if not ok:
             raise ConfigError('Configuration invalid: ' + '; '.join(errors))
 
 
-class Config:
+# provider -> (ConfigSchema field with its API key, error when missing)
+_PROVIDER_REQUIREMENTS = {
+    'anthropic': ('anthropic_api_key', 'ANTHROPIC_API_KEY missing'),
+    'openai': ('openai_api_key', 'OPENAI_API_KEY missing'),
+    'google': ('google_api_key', 'GOOGLE_API_KEY missing'),
+}
+
+
+@lru_cache(maxsize=8)
+def _validate(schema: ConfigSchema) -> Tuple[bool, Tuple[str, ...]]:
+    """Check required values of a (hashable) schema once per distinct instance."""
+    errors = []
+    if not schema.garmin_email:
+        errors.append('GARMIN_EMAIL: missing')
+    if not schema.garmin_password:
+        errors.append('GARMIN_PASSWORD: missing')
+
+    # Ensure provider has API key
+    attr, message = _PROVIDER_REQUIREMENTS.get(schema.llm_provider, (None, None))
+    if attr and not getattr(schema, attr):
+        errors.append(message)
+
+    return (len(errors) == 0, tuple(errors))
+
+
+class _ConfigMeta(type):
+    """Metaclass resolving the legacy path attributes on first access."""
+
+    # Legacy attribute -> lazy classmethod accessor
+    _LAZY_ATTRS = {
+        'OUTPUT_DIR': 'output_dir',
+        'TRAINING_PLAN_PATH': 'training_plan_path',
+        'LOG_FILE': 'log_file',
+    }
+
+    def __getattr__(cls, name: str):
+        accessor = _ConfigMeta._LAZY_ATTRS.get(name)
+        if accessor is None:
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+        return getattr(cls, accessor)()
+
+
+class Config(metaclass=_ConfigMeta):
     """Compatible facade for configuration used across the codebase.
 
     Use `Config.load()` to create and validate a configuration instance.
@@ -133,15 +203,20 @@ class Config:
     ANALYSIS_DAYS: int = 30
 
     BASE_DIR: Path = Path(__file__).parent
-    OUTPUT_DIR: Path = BASE_DIR / os.getenv('OUTPUT_DIR', 'analysis_reports')
-    TRAINING_PLAN_PATH: str = os.getenv('TRAINING_PLAN_PATH', 'plan_trainingpeaks.txt')
+    # OUTPUT_DIR, TRAINING_PLAN_PATH and LOG_FILE are resolved on first
+    # access through _ConfigMeta (see output_dir/training_plan_path/log_file)
 
     LOG_LEVEL: str = 'INFO'
-    LOG_FILE: Path = BASE_DIR / 'training_analyzer.log'
 
     # Internal loaded instance
     _instance: Optional[ConfigSchema] = None
 
+    # Loaded instances keyed by the resolved values of _ENV_KEYS
+    _cache: Dict[tuple, ConfigSchema] = {}
+
+    # provider -> LLM config of the loaded instance, built in _sync_class_attrs
+    _llm_table: Dict[str, Mapping[str, str]] = {}
+
     @classmethod
     def load(cls, env_file: Optional[str] = None, cli_args: Optional[dict] = None) -> ConfigSchema:
         """Carga la configuración desde entorno o un archivo `.env`.
@@ -153,21 +228,34 @@ class Config:
         Returns:
             ConfigSchema: instancia cargada y validada
         """
-        # Only load a specific .env file when explicitly provided to avoid
+        # Resolve every key once: .env file < process environment < CLI args.
+        # Only read a specific .env file when explicitly provided to avoid
         # importing environment from repository-level files during tests.
-        if env_file:
-            load_dotenv(env_file)
+        env: Dict[str, object] = {}
+        if env_file and os.path.exists(env_file):
+            env.update(_read_env_file(env_file, os.path.getmtime(env_file)))
+        environ_get = os.environ.get
+        for key in _ENV_KEYS:
+            value = environ_get(key)
+            if value is not None:
+                env[key] = value
+        if cli_args:
+            env.update(cli_args)
+
+        cache_key = tuple(env.get(key) for key in _ENV_KEYS)
+        cached = cls._cache.get(cache_key)
+        if cached is not None:
+            cls._instance = cached
+            cls._sync_class_attrs(cached)
+            return cached
 
-        # Helper to read env with fallback to CLI args
         def _get(key: str, default=None):
-            if cli_args and key in cli_args:
-                return cli_args[key]
-            return os.getenv(key, default)
+            return env.get(key, default)
 
         # Parse values
         garmin_email = _get('GARMIN_EMAIL', '')
         garmin_password = _get('GARMIN_PASSWORD', '')
-        llm_provider = _get('LLM_PROVIDER', 'anthropic')
+        llm_provider = (_get('LLM_PROVIDER', 'anthropic') or 'anthropic').lower()
         anthropic_api_key = _get('ANTHROPIC_API_KEY', '')
         openai_api_key = _get('OPENAI_API_KEY', '')
         google_api_key = _get('GOOGLE_API_KEY', '')
@@ -203,11 +291,40 @@ class Config:
         )
 
         # Store instance and update class attrs for backwards compatibility
+        cls._cache[cache_key] = instance
         cls._instance = instance
         cls._sync_class_attrs(instance)
 
         return instance
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget memoized instances, parsed .env files and resolved paths."""
+        cls._cache.clear()
+        _read_env_file.cache_clear()
+        _validate.cache_clear()
+        cls.output_dir.cache_clear()
+        cls.training_plan_path.cache_clear()
+        cls.log_file.cache_clear()
+
+    @classmethod
+    @cache
+    def output_dir(cls) -> Path:
+        """Directory for generated reports (legacy `Config.OUTPUT_DIR`)."""
+        return cls.BASE_DIR / os.environ.get('OUTPUT_DIR', 'analysis_reports')
+
+    @classmethod
+    @cache
+    def training_plan_path(cls) -> str:
+        """Training plan file path (legacy `Config.TRAINING_PLAN_PATH`)."""
+        return os.environ.get('TRAINING_PLAN_PATH', 'plan_trainingpeaks.txt')
+
+    @classmethod
+    @cache
+    def log_file(cls) -> Path:
+        """Log file path (legacy `Config.LOG_FILE`)."""
+        return cls.BASE_DIR / 'training_analyzer.log'
+
     @classmethod
     def _default_cache_ttl(cls) -> int:
         return 24
@@ -231,37 +348,43 @@ class Config:
         cls.ANALYSIS_DAYS = instance.analysis_days
         cls.LOG_LEVEL = instance.log_level
 
+        table = _build_llm_table(
+            (instance.anthropic_api_key, instance.anthropic_model),
+            (instance.openai_api_key, instance.openai_model),
+            (instance.google_api_key, instance.google_model),
+        )
+        # Unknown providers (e.g. the 'claude' alias) use Anthropic settings
+        # but keep their own name, as before
+        if instance.llm_provider not in table:
+            table[instance.llm_provider] = MappingProxyType(
+                {**table['anthropic'], 'provider': instance.llm_provider}
+            )
+        cls._llm_table = table
+
     @classmethod
-    def get_llm_config(cls) -> dict:
-        """Return LLM configuration dictionary for the current provider.
+    def get_llm_config(cls) -> Mapping[str, str]:
+        """Return LLM configuration mapping for the current provider.
 
-        Reads from the loaded configuration instance if available, otherwise
-        falls back to class-level attributes.
+        Reads from the table precomputed for the loaded configuration instance
+        if available, otherwise falls back to class-level attributes. The
+        returned mapping is shared and read-only.
 
         Returns:
-            dict: Configuration dictionary containing:
+            Mapping: Configuration mapping containing:
                 - provider: The LLM provider name ('anthropic', 'openai', or 'google')
                 - model: The model name for the selected provider
                 - api_key: The API key for the selected provider
         """
         if cls._instance:
-            provider = cls._instance.llm_provider
-            models = {
-                'anthropic': (cls._instance.anthropic_api_key, cls._instance.anthropic_model),
-                'openai': (cls._instance.openai_api_key, cls._instance.openai_model),
-                'google': (cls._instance.google_api_key, cls._instance.google_model),
-            }
-            api_key, model = models.get(provider, models['anthropic'])
-            return {'api_key': api_key, 'model': model, 'provider': provider}
-
-        # Fallback to legacy class attrs
-        provider = cls.LLM_PROVIDER
-        configs = {
-            'anthropic': {'api_key': cls.ANTHROPIC_API_KEY, 'model': cls.ANTHROPIC_MODEL, 'provider': 'anthropic'},
-            'openai': {'api_key': cls.OPENAI_API_KEY, 'model': cls.OPENAI_MODEL, 'provider': 'openai'},
-            'google': {'api_key': cls.GOOGLE_API_KEY, 'model': cls.GOOGLE_MODEL, 'provider': 'google'},
-        }
-        return configs.get(provider, configs['anthropic'])
+            return cls._llm_table[cls._instance.llm_provider]
+
+        # Fallback to legacy class attrs (may be edited at any time, so not cached)
+        configs = _build_llm_table(
+            (cls.ANTHROPIC_API_KEY, cls.ANTHROPIC_MODEL),
+            (cls.OPENAI_API_KEY, cls.OPENAI_MODEL),
+            (cls.GOOGLE_API_KEY, cls.GOOGLE_MODEL),
+        )
+        return configs.get(cls.LLM_PROVIDER, configs['anthropic'])
 
     @classmethod
     def validate(cls) -> Tuple[bool, list[str]]:
@@ -277,22 +400,8 @@ class Config:
                 - list[str]: List of error messages (empty if valid)
         """
         instance = cls._instance or cls.load()
-        errors = []
-
-        if not instance.garmin_email:
-            errors.append('GARMIN_EMAIL: missing')
-        if not instance.garmin_password:
-            errors.append('GARMIN_PASSWORD: missing')
-
-        # Ensure provider has API key
-        if instance.llm_provider == 'anthropic' and not instance.anthropic_api_key:
-            errors.append('ANTHROPIC_API_KEY missing')
-        if instance.llm_provider == 'openai' and not instance.openai_api_key:
-            errors.append('OPENAI_API_KEY missing')
-        if instance.llm_provider == 'google' and not instance.google_api_key:
-            errors.append('GOOGLE_API_KEY missing')
-
-        return (len(errors) == 0, errors)
+        ok, errors = _validate(instance)
+        return (ok, list(errors))
 
     @classmethod
     def ensure_valid(cls) -> None:
@@ -3,76 +3,158 @@ Cliente para interactuar con Garmin Connect.
 Proporciona acceso a actividades, metricas de salud y composicion corporal.
 """
 
+import asyncio
 import logging
-import time
-from datetime import datetime
-from typing import List, Dict, Optional, Any, Callable
-from functools import wraps
-from garminconnect import Garmin
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date as date_type, datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from functools import lru_cache
+from garminconnect import (
+    Garmin,
+    GarminConnectAuthenticationError,
+    GarminConnectConnectionError,
+    GarminConnectTooManyRequestsError,
+)
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src.cache_manager import CacheManager
+from src.retry import TokenBucket, retry_with_backoff
 
 
-def retry_with_backoff(
-    max_retries: int = 3,
-    initial_delay: float = 1.0,
-    backoff_factor: float = 2.0,
-    exceptions: tuple = (Exception,)
-):
+# Directorio por defecto donde se persisten los tokens OAuth de Garmin (garth)
+DEFAULT_TOKEN_DIR = Path.home() / ".cache" / "garmin-training-analyzer" / "tokens"
+
+# Hilos para las consultas en paralelo (detalles de actividades)
+_RANGE_WORKERS = 8
+
+# Pool HTTP del cliente garth: conexiones keep-alive reutilizables entre llamadas.
+# El tamaño cubre con holgura los hilos de get_activity_details_bulk para que ninguno abra un socket nuevo
+_HTTP_POOL_CONNECTIONS = 4
+_HTTP_POOL_MAXSIZE = 2 * _RANGE_WORKERS
+_HTTP_RETRIES = 3
+_HTTP_BACKOFF_FACTOR = 0.3
+
+# Límite de peticiones a Garmin: ritmo sostenido y ráfaga máxima
+_REQUESTS_PER_SEC = 8.0
+_REQUESTS_BURST = 2 * _RANGE_WORKERS
+
+# Los rangos largos de actividades se piden en ventanas de este tamaño, en paralelo
+_ACTIVITY_WINDOW_DAYS = 30
+_ACTIVITY_WORKERS = 4
+
+# Los datos de días ya cerrados no cambian: se cachean durante mucho más tiempo
+_HISTORICAL_TTL = timedelta(days=365)
+
+# Respuestas vacías (días sin reloj, rangos sin actividades): se recuerdan poco tiempo
+# para no repetir la consulta en cada informe sin tapar datos que se sincronicen después
+_NEGATIVE_TTL = timedelta(hours=1)
+_EMPTY_MARKER = {"__empty__": True}
+
+# Dispositivos y equipamiento cambian como mucho semanalmente
+_INVENTORY_TTL = timedelta(days=7)
+
+# Errores de red transitorios: merece la pena reintentarlos
+_TRANSIENT_ERRORS = (
+    GarminConnectConnectionError,
+    GarminConnectTooManyRequestsError,
+    RequestException,
+)
+
+# Errores que ningún reintento arregla (credenciales inválidas, sesión revocada)
+_UNRECOVERABLE_ERRORS = (GarminConnectAuthenticationError,)
+
+# Perfil por defecto cuando Garmin no lo proporciona
+_DEFAULT_PROFILE = {"name": "Usuario", "unit_system": "metric"}
+
+# Claves en las que Garmin devuelve la lista de mediciones de composición corporal
+_BC_KEYS = ('dateWeightList', 'dailyWeightSummaries', 'weightList')
+
+
+def _extract_from_dict(composition: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Devuelve la primera lista de mediciones no vacía del dict, o None si no hay ninguna."""
+    measurements = next((composition[k] for k in _BC_KEYS if k in composition), None)
+    return measurements or None
+
+
+# Tipo de respuesta de get_body_composition -> extractor de la lista de mediciones
+_BC_DISPATCH: Dict[type, Callable[[Any], Optional[List[Dict[str, Any]]]]] = {
+    dict: _extract_from_dict,
+    list: lambda composition: composition,
+}
+
+
+@lru_cache(maxsize=4096)
+def _fmt_date(ordinal: int) -> str:
+    """Formatea el ordinal de un día como YYYY-MM-DD (memorizado: el mismo día se pide en varios endpoints)."""
+    return date_type.fromordinal(ordinal).isoformat()
+
+
+def _iso_date(value: datetime) -> str:
+    """Formatea un datetime (o date) como YYYY-MM-DD."""
+    return _fmt_date(value.toordinal())
+
+
+def _activity_windows(start_date: datetime, end_date: datetime) -> List[Tuple[datetime, datetime]]:
     """
-    Decorador para reintentar funciones con backoff exponencial.
+    Divide un rango en ventanas de _ACTIVITY_WINDOW_DAYS días alineadas al ordinal del día.
+
+    La alineación fija hace que rangos solapados compartan las ventanas interiores
+    y, con ellas, sus entradas de caché.
 
     Args:
-        max_retries: Número máximo de reintentos
-        initial_delay: Delay inicial en segundos
-        backoff_factor: Factor de multiplicación del delay
-        exceptions: Tupla de excepciones a capturar
+        start_date: Fecha de inicio
+        end_date: Fecha de fin
 
     Returns:
-        Función decorada con retry
+        Ventanas (inicio, fin) ordenadas cronológicamente, recortadas al rango
     """
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            delay = initial_delay
-            last_exception = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-
-                    if attempt < max_retries:
-                        # Obtener logger si está disponible
-                        if args and hasattr(args[0], 'logger'):
-                            logger = args[0].logger
-                            logger.warning(
-                                "Error en %s (intento %d/%d): %s. Reintentando en %.1fs...",
-                                func.__name__, attempt + 1, max_retries + 1, e, delay
-                            )
-
-                        time.sleep(delay)
-                        delay *= backoff_factor
-                    else:
-                        # Último intento fallido
-                        if args and hasattr(args[0], 'logger'):
-                            logger = args[0].logger
-                            logger.error(
-                                "Error en %s después de %d intentos: %s",
-                                func.__name__, max_retries + 1, e
-                            )
-
-            # Si llegamos aquí, todos los intentos fallaron
-            raise last_exception
-
-        return wrapper
-    return decorator
-
-
-class GarminClient:
+    first, last = start_date.toordinal(), end_date.toordinal()
+    windows = []
+    ordinal = first
+    while ordinal <= last:
+        window_end = min(last, ordinal - ordinal % _ACTIVITY_WINDOW_DAYS + _ACTIVITY_WINDOW_DAYS - 1)
+        windows.append((datetime.fromordinal(ordinal), datetime.fromordinal(window_end)))
+        ordinal = window_end + 1
+    return windows
+
+
+class GarminClient:  # pylint: disable=too-many-instance-attributes
     """Cliente para interactuar con Garmin Connect API."""
 
-    def __init__(self, email: str, password: str, use_cache: bool = True, cache_ttl_hours: int = 24):
+    # Conjunto de atributos fijo: sin __dict__ por instancia
+    __slots__ = (
+        'email',
+        'password',
+        'client',
+        'logger',
+        'use_cache',
+        'cache',
+        'token_dir',
+        'activity_detail_ttl',
+        '_login_lock',
+        '_bucket',
+        '_inflight',
+        '_inflight_lock',
+        '_profile_cache',
+        '_devices_cache',
+        '_gear_cache',
+        '_details_cache',
+        '_user_id',
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        email: str,
+        password: str,
+        use_cache: bool = True,
+        cache_ttl_hours: int = 24,
+        token_dir: Optional[str] = None,
+        activity_detail_ttl_days: int = 30,
+        requests_per_sec: float = _REQUESTS_PER_SEC
+    ):
         """
         Inicializa el cliente de Garmin.
 
@@ -81,12 +163,32 @@ class GarminClient:
             password: Contrasena de la cuenta de Garmin
             use_cache: Si True, usa caché para reducir llamadas a la API
             cache_ttl_hours: Tiempo de vida del caché en horas
+            token_dir: Directorio donde persistir la sesión (default: DEFAULT_TOKEN_DIR)
+            activity_detail_ttl_days: Tiempo de vida en caché de detalles y splits
+                (una actividad terminada ya no cambia)
+            requests_per_sec: Peticiones por segundo a Garmin, compartidas por todos los hilos
         """
         self.email = email
         self.password = password
         self.client: Optional[Garmin] = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.use_cache = use_cache
+        self.token_dir = Path(token_dir) if token_dir else DEFAULT_TOKEN_DIR
+        self.activity_detail_ttl = timedelta(days=activity_detail_ttl_days)
+        # Serializa el login; las peticiones en paralelo comparten la sesión
+        self._login_lock = threading.Lock()
+        # Todos los hilos comparten el límite de peticiones para no provocar 429
+        self._bucket = TokenBucket(requests_per_sec, _REQUESTS_BURST)
+        # Peticiones en curso por clave: los hilos que piden lo mismo esperan la misma respuesta
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Datos invariantes durante la sesión (None = aún no consultado)
+        self._profile_cache: Optional[Dict[str, Any]] = None
+        self._devices_cache: Optional[List[Dict[str, Any]]] = None
+        self._gear_cache: Optional[List[Dict[str, Any]]] = None
+        self._details_cache: Dict[str, Dict[str, Any]] = {}
+        self._user_id: Optional[str] = None
 
         # Inicializar caché si está habilitado
         if self.use_cache:
@@ -104,24 +206,221 @@ class GarminClient:
             bool: True si la conexion fue exitosa
         """
         try:
-            self.logger.info("Conectando con Garmin Connect...")
-            self.client = Garmin(self.email, self.password)
-            self.client.login()
+            with self._login_lock:
+                self.logger.info("Conectando con Garmin Connect...")
+                client = Garmin(self.email, self.password)
+
+                # Reutilizar la sesión guardada evita el login OAuth completo
+                if not self._resume_session(client):
+                    client.login()
+                    self._save_session(client)
+
+                self._configure_http_pool(client)
+                self.client = client
+                # Una sesión nueva no debe servir datos memorizados de la anterior
+                self.invalidate_cache()
             self.logger.info("Conexion exitosa con Garmin")
             return True
         except Exception as e:
             self.logger.error("Error conectando con Garmin: %s", e)
             return False
 
-    @retry_with_backoff(max_retries=3, initial_delay=2.0, backoff_factor=2.0)
+    def _resume_session(self, client: Garmin) -> bool:
+        """
+        Intenta iniciar sesión con los tokens persistidos en token_dir.
+
+        Args:
+            client: Instancia de Garmin sin autenticar
+
+        Returns:
+            bool: True si la sesión guardada sigue siendo válida
+        """
+        if not self.token_dir.is_dir():
+            return False
+
+        try:
+            client.login(tokenstore=str(self.token_dir))
+            self.logger.info("Sesion de Garmin reutilizada desde %s", self.token_dir)
+            return True
+        except Exception as e:
+            self.logger.debug("No se pudo reutilizar la sesion guardada: %s", e)
+            return False
+
+    def _save_session(self, client: Garmin) -> None:
+        """
+        Persiste los tokens OAuth de la sesión actual para futuras ejecuciones.
+
+        Args:
+            client: Instancia de Garmin autenticada
+        """
+        try:
+            self.token_dir.mkdir(parents=True, exist_ok=True)
+            client.garth.dump(str(self.token_dir))
+        except Exception as e:
+            self.logger.warning("No se pudo guardar la sesion de Garmin: %s", e)
+
+    def _configure_http_pool(self, client: Garmin) -> None:
+        """
+        Configura el pool de conexiones keep-alive de la sesión HTTP de garth.
+
+        Args:
+            client: Instancia de Garmin autenticada
+        """
+        try:
+            client.garth.configure(
+                pool_connections=_HTTP_POOL_CONNECTIONS,
+                pool_maxsize=_HTTP_POOL_MAXSIZE,
+                retries=_HTTP_RETRIES,
+                backoff_factor=_HTTP_BACKOFF_FACTOR
+            )
+            return
+        except (AttributeError, TypeError) as e:
+            self.logger.debug("garth.configure no admite pool HTTP: %s", e)
+
+        # Versiones de garth sin configure(): montar el adaptador en la sesión
+        try:
+            adapter = HTTPAdapter(
+                pool_connections=_HTTP_POOL_CONNECTIONS,
+                pool_maxsize=_HTTP_POOL_MAXSIZE,
+                max_retries=Retry(total=_HTTP_RETRIES, backoff_factor=_HTTP_BACKOFF_FACTOR)
+            )
+            client.garth.sess.mount("https://", adapter)
+        except AttributeError as e:
+            self.logger.debug("No se pudo configurar el pool HTTP: %s", e)
+
+    @retry_with_backoff(
+        max_retries=3, initial_delay=2.0, backoff_factor=2.0, unrecoverable=_UNRECOVERABLE_ERRORS
+    )
     def _fetch_activities_from_api(self, start_str: str, end_str: str) -> List[Dict[str, Any]]:
         """Obtiene actividades de la API de Garmin con retry."""
+        self._bucket.acquire()
         return self.client.get_activities_by_date(start_str, end_str)
 
+    @retry_with_backoff(
+        max_retries=3, initial_delay=2.0, backoff_factor=2.0, unrecoverable=_UNRECOVERABLE_ERRORS
+    )
+    def _fetch_activity_details_from_api(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene detalles de una actividad de la API de Garmin con retry."""
+        self._bucket.acquire()
+        return self.client.get_activity(activity_id)
+
+    @retry_with_backoff(
+        max_retries=3, initial_delay=2.0, backoff_factor=2.0, unrecoverable=_UNRECOVERABLE_ERRORS
+    )
+    def _fetch_activity_splits_from_api(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene splits de una actividad de la API de Garmin con retry."""
+        self._bucket.acquire()
+        return self.client.get_activity_splits(activity_id)
+
+    def _single_flight(self, key: Tuple[str, str], fetch: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fetch una sola vez aunque varios hilos pidan la misma clave a la vez.
+
+        Args:
+            key: Identificador de la petición (tipo, id)
+            fetch: Llamada a la API a deduplicar
+
+        Returns:
+            Resultado de fetch (los hilos en espera reciben el mismo resultado o excepción)
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fetch())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        return future.result()
+
+    def _cache_get(self, kind: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Lee una respuesta del caché en disco si está habilitado."""
+        if self.use_cache and self.cache:
+            return self.cache.get_entry(kind, params)
+        return None
+
+    def _cache_set(self, kind: str, params: Dict[str, Any], data: Any, ttl: Optional[timedelta] = None):
+        """Guarda una respuesta en el caché en disco si está habilitado y no está vacía."""
+        if self.use_cache and self.cache and data:
+            self.cache.set_entry(kind, params, data, ttl)
+
+    @staticmethod
+    def _is_historical(date: datetime) -> bool:
+        """True si la fecha es anterior a ayer (sus datos ya no van a cambiar)."""
+        return date.date() < datetime.now().date() - timedelta(days=1)
+
+    def _range_ttl(self, end_date: datetime, data: List[Dict[str, Any]]) -> Optional[timedelta]:
+        """TTL para el resultado de un rango: corto si vino vacío, largo si el rango ya está cerrado."""
+        if not data:
+            return _NEGATIVE_TTL
+        return _HISTORICAL_TTL if self._is_historical(end_date) else None
+
+    def _get_daily(
+        self,
+        kind: str,
+        date: datetime,
+        fetch: Callable[[str], Any],
+        label: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene datos de un día, usando el caché en disco para días históricos.
+
+        Args:
+            kind: Tipo de datos para el caché
+            date: Fecha a consultar
+            fetch: Método del cliente Garmin que recibe la fecha (YYYY-MM-DD)
+            label: Descripción para los logs de error
+
+        Returns:
+            Datos del día o None
+        """
+        day = _iso_date(date)
+        # Los días en curso cambian a lo largo del día: solo se cachean los cerrados
+        historical = self._is_historical(date)
+        if historical:
+            cached = self._cache_get(kind, {"date": day})
+            if cached is not None:
+                return None if cached == _EMPTY_MARKER else cached
+
+        try:
+            self._bucket.acquire()
+            data = fetch(day)
+            if historical:
+                if data:
+                    self._cache_set(kind, {"date": day}, data, _HISTORICAL_TTL)
+                else:
+                    self._cache_set(kind, {"date": day}, _EMPTY_MARKER, _NEGATIVE_TTL)
+            return data
+        except Exception as e:
+            self.logger.warning("Error obteniendo %s para %s: %s", label, date.date(), e)
+            return None
+
+    def invalidate_cache(self) -> None:
+        """Descarta los datos de sesión memorizados (perfil, dispositivos, equipamiento, detalles)."""
+        self._profile_cache = None
+        self._devices_cache = None
+        self._gear_cache = None
+        self._details_cache.clear()
+        self._user_id = None
+
     def get_activities(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """
         Obtiene actividades en un rango de fechas.
 
+        Los rangos de más de _ACTIVITY_WINDOW_DAYS días se piden en ventanas
+        alineadas a un calendario fijo, en paralelo y cacheadas por separado:
+        una ventana móvil (p. ej. los últimos 90 días) reutiliza casi todas.
+        Garmin devuelve cada ventana de la más reciente a la más antigua, así
+        que se concatenan empezando por la última para mantener ese orden.
+
         Args:
             start_date: Fecha de inicio
             end_date: Fecha de fin
@@ -133,8 +432,27 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return []
 
-        start_str = start_date.strftime("%Y-%m-%d")
-        end_str = end_date.strftime("%Y-%m-%d")
+        if (end_date - start_date).days <= _ACTIVITY_WINDOW_DAYS:
+            return self._get_activities_window(start_date, end_date)
+
+        windows = _activity_windows(start_date, end_date)
+        with ThreadPoolExecutor(max_workers=min(_ACTIVITY_WORKERS, len(windows))) as executor:
+            chunks = list(executor.map(lambda window: self._get_activities_window(*window), windows))
+        return [activity for chunk in reversed(chunks) for activity in chunk]
+
+    def _get_activities_window(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """
+        Obtiene las actividades de un único rango de fechas (con caché).
+
+        Args:
+            start_date: Fecha de inicio
+            end_date: Fecha de fin
+
+        Returns:
+            Lista de actividades ([] si la consulta falla)
+        """
+        start_str = _iso_date(start_date)
+        end_str = _iso_date(end_date)
 
         # Intentar obtener del caché primero
         if self.use_cache and self.cache:
@@ -150,9 +468,11 @@ class GarminClient:
 
             self.logger.info("%s actividades obtenidas", len(activities))
 
-            # Guardar en caché
-            if self.use_cache and self.cache and activities:
-                self.cache.set_activities(start_str, end_str, activities)
+            # Guardar en caché (los rangos ya cerrados no van a cambiar; los vacíos, poco tiempo)
+            if self.use_cache and self.cache and activities is not None:
+                self.cache.set_activities(
+                    start_str, end_str, activities, ttl=self._range_ttl(end_date, activities)
+                )
 
             return activities
 
@@ -174,13 +494,66 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return None
 
+        cached_details = self._cached_activity_details(activity_id)
+        if cached_details is not None:
+            return cached_details
+
         try:
-            details = self.client.get_activity(activity_id)
+            details = self._single_flight(
+                ("activity_details", activity_id),
+                lambda: self._fetch_activity_details_from_api(activity_id)
+            )
+            if details:
+                self._details_cache[activity_id] = details
+                self._cache_set(
+                    "activity_details", {"activity_id": activity_id}, details, self.activity_detail_ttl
+                )
             return details
         except Exception as e:
             self.logger.error("Error obteniendo detalles de actividad %s: %s", activity_id, e)
             return None
 
+    def _cached_activity_details(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        """Busca los detalles de una actividad en memoria y, si no, en el caché en disco."""
+        cached_details = self._details_cache.get(activity_id)
+        if cached_details is None:
+            cached_details = self._cache_get("activity_details", {"activity_id": activity_id})
+            if cached_details is not None:
+                self._details_cache[activity_id] = cached_details
+        return cached_details
+
+    def get_activity_details_bulk(
+        self,
+        activity_ids: List[str],
+        max_workers: int = _RANGE_WORKERS
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Obtiene detalles de varias actividades en paralelo (con caché).
+
+        Args:
+            activity_ids: IDs de las actividades
+            max_workers: Número máximo de hilos
+
+        Returns:
+            Diccionario activity_id -> detalles (None si fallan)
+        """
+        if not self.client:
+            self.logger.error("Cliente no conectado")
+            return dict.fromkeys(activity_ids)
+        if not activity_ids:
+            return {}
+
+        # Los aciertos de caché se resuelven aquí; solo los fallos ocupan un hilo
+        results = {activity_id: self._cached_activity_details(activity_id) for activity_id in activity_ids}
+        misses = [activity_id for activity_id, details in results.items() if details is None]
+        if not misses:
+            return results
+
+        # Los workers comparten el pool keep-alive montado en connect()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as executor:
+            results.update(zip(misses, executor.map(self.get_activity_details, misses)))
+        return results
+
     def get_activity_splits(self, activity_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene splits de una actividad.
@@ -195,13 +568,30 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return None
 
+        cached_splits = self._cache_get("activity_splits", {"activity_id": activity_id})
+        if cached_splits is not None:
+            return cached_splits
+
         try:
-            splits = self.client.get_activity_splits(activity_id)
+            splits = self._single_flight(
+                ("activity_splits", activity_id),
+                lambda: self._fetch_activity_splits_from_api(activity_id)
+            )
+            self._cache_set(
+                "activity_splits", {"activity_id": activity_id}, splits, self.activity_detail_ttl
+            )
             return splits
         except Exception as e:
             self.logger.error("Error obteniendo splits de actividad %s: %s", activity_id, e)
             return None
 
+    def _fetch_user_profile_from_api(self) -> Dict[str, Any]:
+        """Lee el perfil de la sesión de Garmin (atributos locales, sin llamadas HTTP)."""
+        return {
+            "name": self.client.get_full_name(),
+            "unit_system": self.client.get_unit_system()
+        }
+
     def get_user_profile(self) -> Dict[str, Any]:
         """
         Obtiene informacion del perfil del usuario.
@@ -212,20 +602,21 @@ class GarminClient:
         if not self.client:
             return {}
 
+        if self._profile_cache is not None:
+            return self._profile_cache
+
         # Intentar obtener del caché primero
         if self.use_cache and self.cache:
             cached_profile = self.cache.get_user_profile()
             if cached_profile is not None:
+                self._profile_cache = cached_profile
                 return cached_profile
 
         # Si no está en caché, obtener de la API
         try:
             self.logger.info("Obteniendo perfil de usuario de Garmin API...")
 
-            profile = {
-                "name": self.client.get_full_name(),
-                "unit_system": self.client.get_unit_system()
-            }
+            profile = self._single_flight(("profile", self.email), self._fetch_user_profile_from_api)
 
             self.logger.info("Perfil obtenido: %s", profile['name'])
 
@@ -233,18 +624,23 @@ class GarminClient:
             if self.use_cache and self.cache and profile:
                 self.cache.set_user_profile(profile)
 
+            self._profile_cache = profile
             return profile
 
         except Exception as e:
+            # No memorizar el perfil por defecto: el siguiente intento vuelve a consultar
             self.logger.warning("Error obteniendo perfil: %s", e)
-            return {"name": "Usuario", "unit_system": "metric"}
+            return dict(_DEFAULT_PROFILE)
 
-    @retry_with_backoff(max_retries=3, initial_delay=2.0, backoff_factor=2.0)
+    @retry_with_backoff(
+        max_retries=3, initial_delay=2.0, backoff_factor=2.0, unrecoverable=_UNRECOVERABLE_ERRORS
+    )
     def _fetch_body_composition_from_api(self, start_str: str, end_str: str):
         """Obtiene composición corporal de la API de Garmin con retry."""
+        self._bucket.acquire()
         return self.client.get_body_composition(start_str, end_str)
 
-    def get_body_composition(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:  # pylint: disable=too-many-branches
+    def get_body_composition(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """
         Obtiene datos de composicion corporal (peso, % grasa) en un rango de fechas.
 
@@ -259,8 +655,8 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return []
 
-        start_str = start_date.strftime("%Y-%m-%d")
-        end_str = end_date.strftime("%Y-%m-%d")
+        start_str = _iso_date(start_date)
+        end_str = _iso_date(end_date)
 
         # Intentar obtener del caché primero
         if self.use_cache and self.cache:
@@ -277,37 +673,27 @@ class GarminClient:
             # FIX: Garmin puede devolver dict o list
             measurements = []
             if composition:
-                # Si es un diccionario, extraer la lista de mediciones
-                if isinstance(composition, dict):
-                    # Buscar la clave que contiene las mediciones
-                    # Comunes: 'dateWeightList', 'dailyWeightSummaries', etc
-                    for key in ['dateWeightList', 'dailyWeightSummaries', 'weightList']:
-                        if key in composition:
-                            measurements = composition[key]
-                            self.logger.info("%s mediciones obtenidas", len(measurements))
-                            break
-
-                    if not measurements:
+                handler = _BC_DISPATCH.get(type(composition))
+                if handler is None:
+                    self.logger.warning("Tipo inesperado: %s", type(composition))
+                else:
+                    measurements = handler(composition)
+                    if measurements is None:
                         # Si no encontramos clave conocida, loguear estructura
-                        self.logger.warning("Estructura desconocida. Keys: %s", list(composition.keys()))
+                        if self.logger.isEnabledFor(logging.WARNING):
+                            self.logger.warning("Estructura desconocida. Keys: %s", list(composition.keys()))
                         # Intentar devolver el dict completo como lista
                         measurements = [composition]
-
-                # Si ya es una lista, devolverla directamente
-                elif isinstance(composition, list):
-                    measurements = composition
-                    self.logger.info("%s mediciones obtenidas", len(measurements))
-
-                else:
-                    self.logger.warning("Tipo inesperado: %s", type(composition))
-                    measurements = []
+                    elif self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info("%s mediciones obtenidas", len(measurements))
             else:
                 self.logger.info("No hay datos de composicion corporal")
-                measurements = []
 
-            # Guardar en caché
-            if self.use_cache and self.cache and measurements:
-                self.cache.set_body_composition(start_str, end_str, measurements)
+            # Guardar en caché (los rangos ya cerrados no van a cambiar; los vacíos, poco tiempo)
+            if self.use_cache and self.cache:
+                self.cache.set_body_composition(
+                    start_str, end_str, measurements, ttl=self._range_ttl(end_date, measurements)
+                )
 
             return measurements
 
@@ -329,12 +715,7 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return None
 
-        try:
-            stats = self.client.get_stats(date.strftime("%Y-%m-%d"))
-            return stats
-        except Exception as e:
-            self.logger.warning("Error obteniendo stats para %s: %s", date.date(), e)
-            return None
+        return self._get_daily("daily_stats", date, self.client.get_stats, "stats")
 
     def get_heart_rates(self, date: datetime) -> Optional[Dict[str, Any]]:
         """
@@ -350,12 +731,7 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return None
 
-        try:
-            hr_data = self.client.get_heart_rates(date.strftime("%Y-%m-%d"))
-            return hr_data
-        except Exception as e:
-            self.logger.warning("Error obteniendo FC para %s: %s", date.date(), e)
-            return None
+        return self._get_daily("heart_rates", date, self.client.get_heart_rates, "FC")
 
     def get_body_battery(self, date: datetime) -> Optional[Dict[str, Any]]:
         """
@@ -371,12 +747,34 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return None
 
-        try:
-            battery = self.client.get_body_battery(date.strftime("%Y-%m-%d"))
-            return battery
-        except Exception as e:
-            self.logger.warning("Error obteniendo Body Battery para %s: %s", date.date(), e)
-            return None
+        return self._get_daily("body_battery", date, self.client.get_body_battery, "Body Battery")
+
+    # Variantes asíncronas: ejecutan el getter síncrono en un hilo para poder
+    # combinarlas con asyncio.gather sin bloquear el event loop
+
+    async def a_get_activities(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Versión asíncrona de get_activities."""
+        return await asyncio.to_thread(self.get_activities, start_date, end_date)
+
+    async def a_get_activity_details(self, activity_id: str) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de get_activity_details."""
+        return await asyncio.to_thread(self.get_activity_details, activity_id)
+
+    async def a_get_body_composition(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Versión asíncrona de get_body_composition."""
+        return await asyncio.to_thread(self.get_body_composition, start_date, end_date)
+
+    async def a_get_daily_stats(self, date: datetime) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de get_daily_stats."""
+        return await asyncio.to_thread(self.get_daily_stats, date)
+
+    async def a_get_heart_rates(self, date: datetime) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de get_heart_rates."""
+        return await asyncio.to_thread(self.get_heart_rates, date)
+
+    async def a_get_body_battery(self, date: datetime) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de get_body_battery."""
+        return await asyncio.to_thread(self.get_body_battery, date)
 
     def get_devices(self) -> List[Dict[str, Any]]:
         """
@@ -389,13 +787,49 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return []
 
+        if self._devices_cache is not None:
+            return self._devices_cache
+
+        cached_devices = self._cache_get("devices", {"user": self.email})
+        if cached_devices is not None:
+            self._devices_cache = cached_devices
+            return cached_devices
+
         try:
+            self._bucket.acquire()
             devices = self.client.get_devices()
-            return devices if devices else []
+            self._devices_cache = devices if devices else []
+            self._cache_set("devices", {"user": self.email}, self._devices_cache, _INVENTORY_TTL)
+            return self._devices_cache
         except Exception as e:
             self.logger.warning("Error obteniendo dispositivos: %s", e)
             return []
 
+    @retry_with_backoff(
+        max_retries=3, initial_delay=2.0, backoff_factor=2.0, unrecoverable=_UNRECOVERABLE_ERRORS
+    )
+    def _fetch_profile_id_from_api(self) -> Optional[Any]:
+        """Obtiene el profileId del perfil social de garth con retry."""
+        self._bucket.acquire()
+        return (self.client.garth.profile or {}).get("profileId")
+
+    def _get_user_id(self) -> Optional[str]:
+        """
+        Obtiene (una vez por sesión) el ID numérico del perfil que requiere get_gear.
+
+        garth carga el perfil social de forma perezosa: con una sesión reanudada
+        desde tokens, la primera lectura hace una petición HTTP (y lanza
+        AssertionError si la respuesta no es un dict). Los errores se propagan
+        sin memorizarse, para que la siguiente llamada vuelva a intentarlo.
+
+        Returns:
+            ID del perfil o None si el perfil no lo incluye
+        """
+        if self._user_id is None:
+            user_id = self._fetch_profile_id_from_api()
+            self._user_id = str(user_id) if user_id else ""
+        return self._user_id or None
+
     def get_gear(self) -> List[Dict[str, Any]]:
         """
         Obtiene equipamiento del usuario (calzado, etc).
@@ -407,22 +841,60 @@ class GarminClient:
             self.logger.error("Cliente no conectado")
             return []
 
+        if self._gear_cache is not None:
+            return self._gear_cache
+
         try:
             try:
                 # get_gear requiere userProfileNumber
-                # Intentar obtenerlo del perfil del usuario
-                profile = self.get_user_profile()
-                if profile and 'id' in profile:
-                    user_id = profile['id']
+                user_id = self._get_user_id()
+                if user_id:
+                    cached_gear = self._cache_get("gear", {"user_id": user_id})
+                    if cached_gear is not None:
+                        self._gear_cache = cached_gear
+                        return cached_gear
+
+                    self._bucket.acquire()
                     gear = self.client.get_gear(userProfileNumber=user_id)
-                    return gear if gear else []
-                else:
-                    self.logger.debug("No se pudo obtener ID del usuario para get_gear")
-                    return []
+                    self._gear_cache = gear if gear else []
+                    self._cache_set("gear", {"user_id": user_id}, self._gear_cache, _INVENTORY_TTL)
+                    return self._gear_cache
+                # Sin ID no hay equipamiento que pedir en toda la sesión
+                self.logger.debug("No se pudo obtener ID del usuario para get_gear")
+                self._gear_cache = []
+                return self._gear_cache
             except (TypeError, ValueError):
                 # get_gear puede requerir parametros que no disponemos
                 self.logger.debug("get_gear no disponible con los parametros actuales")
                 return []
         except Exception as e:
             self.logger.warning("Error obteniendo equipamiento: %s", e)
-            return []
\ No newline at end of file
+            return []
+
+
+_shared_clients: Dict[Tuple[str, str], GarminClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_client(email: str, password: str) -> Optional[GarminClient]:
+    """
+    Devuelve un GarminClient conectado y compartido dentro del proceso.
+
+    La primera llamada para unas credenciales crea y conecta el cliente; las
+    siguientes reutilizan la misma instancia (sesión HTTP, pool y caché).
+
+    Args:
+        email: Email de la cuenta de Garmin
+        password: Contrasena de la cuenta de Garmin
+
+    Returns:
+        GarminClient conectado o None si la conexion falla
+    """
+    with _shared_clients_lock:
+        client = _shared_clients.get((email, password))
+        if client is None:
+            client = GarminClient(email, password)
+            if not client.connect():
+                return None
+            _shared_clients[(email, password)] = client
+        return client
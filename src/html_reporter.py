@@ -1,44 +1,306 @@
 """
 Generador de reportes HTML para el análisis de entrenamiento.
 
-Crea reportes responsive con gráficos embebidos utilizando plantillas
-Jinja2 externas. Las plantillas HTML y CSS se cargan desde src/templates/
+Crea reportes responsive con gráficos (enlazados o embebidos) utilizando
+plantillas Jinja2 externas. Las plantillas HTML y CSS se cargan desde src/templates/
 (report_template.html y report_styles.css).
 """
 
-import base64
+import binascii
+import gzip
+import hashlib
+import io
 import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-from jinja2 import Environment, FileSystemLoader
-import markdown
+from typing import IO, List, Dict, Any, NamedTuple, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from src.cache_manager import DEFAULT_CACHE_DIR
+
+try:
+    import pybase64
+except ImportError:  # pragma: no cover - pybase64 es opcional
+    pybase64 = None
+
+try:
+    import minify_html
+except ImportError:  # pragma: no cover - minify-html es opcional
+    minify_html = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow es opcional
+    Image = None
+
+# Actividades más recientes que se listan en la tabla del reporte
+_TABLE_ACTIVITIES = 20
+
+# Hilos para leer y codificar los gráficos en paralelo
+_EMBED_WORKERS = 8
+
+# Tamaño de lectura al codificar gráficos; múltiplo de 3 para que cada bloque
+# en base64 no lleve relleno y los bloques se puedan concatenar
+_B64_CHUNK_SIZE = 3 * 64 * 1024
+_DATA_URI_PREFIX = b"data:image/png;base64,"
+
+# Al embeber, los gráficos grandes se pasan a WebP sin pérdida y se reducen al
+# ancho máximo que muestra la plantilla; los pequeños no compensan la transcodificación
+_TRANSCODE_MIN_BYTES = 30 * 1024
+_MAX_CHART_SIZE = 1400
+
+# Nivel de compresión de los reportes .html.gz (buen equilibrio tamaño/CPU)
+_GZIP_LEVEL = 6
+
+# Bytecode de las plantillas compiladas, reutilizado entre ejecuciones; vive
+# junto al caché SQLite del proyecto en lugar de en el HOME del usuario
+_BYTECODE_CACHE_DIR = Path(DEFAULT_CACHE_DIR) / "jinja"
+_BYTECODE_PATTERN = "__jinja2_autoescape_%s.cache"
+
+
+def _b64encode(data: bytes) -> bytes:
+    """Codifica en base64 sin saltos de línea (pybase64, con SIMD, si está disponible)."""
+    if pybase64 is not None:
+        return pybase64.b64encode(data)
+    return binascii.b2a_base64(data, newline=False)
+
+
+def _png_data_uri(chart_path: Path) -> str:
+    """
+    Codifica un PNG como data URI leyendo el archivo por bloques.
+
+    El buffer de salida se reserva de una vez con el tamaño final, así que ni
+    el archivo completo ni copias intermedias llegan a estar en memoria.
+
+    Args:
+        chart_path: Ruta al archivo PNG
+
+    Returns:
+        Cadena data:image/png;base64,...
+    """
+    size = os.stat(chart_path).st_size
+    buffer = bytearray(len(_DATA_URI_PREFIX) + (size + 2) // 3 * 4)
+    buffer[:len(_DATA_URI_PREFIX)] = _DATA_URI_PREFIX
+    position = len(_DATA_URI_PREFIX)
+    with open(chart_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_B64_CHUNK_SIZE), b''):
+            encoded = _b64encode(chunk)
+            buffer[position:position + len(encoded)] = encoded
+            position += len(encoded)
+    # Si el archivo cambió de tamaño durante la lectura, recortar a lo escrito
+    if position != len(buffer):
+        del buffer[position:]
+    return buffer.decode('ascii')
+
+
+@lru_cache(maxsize=None)
+def _template_env(template_dir: str) -> Environment:
+    """
+    Crea (una vez por directorio) el entorno Jinja2 de las plantillas.
+
+    Las plantillas compiladas quedan en la caché del entorno; sin auto_reload
+    no se vuelve a consultar el disco para comprobar si cambiaron. Además, su
+    bytecode se guarda en _BYTECODE_CACHE_DIR para que las siguientes
+    ejecuciones no tengan que volver a compilarlas (Jinja lo invalida si la
+    plantilla cambia).
+
+    Args:
+        template_dir: Directorio de plantillas
+
+    Returns:
+        Entorno Jinja2 compartido
+    """
+    bytecode_cache = None
+    try:
+        _BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # El bytecode lleva compilado el autoescape: un nombre propio evita
+        # reutilizar el de plantillas compiladas sin él
+        bytecode_cache = FileSystemBytecodeCache(str(_BYTECODE_CACHE_DIR), _BYTECODE_PATTERN)
+    except OSError as e:
+        logging.getLogger(__name__).debug("Caché de bytecode de plantillas no disponible: %s", e)
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+        # Escapa todas las variables de las plantillas .html; el análisis ya
+        # convertido a HTML se marca con |safe en la plantilla
+        autoescape=select_autoescape(['html'])
+    )
+
+
+def _webp_data_uri(chart_path: Path) -> Optional[str]:
+    """
+    Transcodifica un gráfico a WebP sin pérdida (reducido al ancho máximo del reporte) como data URI.
+
+    Args:
+        chart_path: Ruta al archivo PNG
+
+    Returns:
+        Cadena data:image/webp;base64,... o None si Pillow no está disponible,
+        no puede leer la imagen o codificar WebP, o el WebP no resulta más
+        pequeño que el PNG
+    """
+    if Image is None:
+        return None
+
+    try:
+        with Image.open(chart_path) as img:
+            img.thumbnail((_MAX_CHART_SIZE, _MAX_CHART_SIZE), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            # Sin pérdida: el WebP con pérdida deja artefactos en textos y líneas de los gráficos
+            img.save(buffer, format='WEBP', lossless=True)
+    except (OSError, KeyError, ValueError) as e:
+        # Pillow sin codificador WebP lanza KeyError('WEBP'): se embebe el PNG original
+        logging.getLogger(__name__).debug("No se pudo transcodificar %s a WebP: %s", chart_path, e)
+        return None
+
+    data = buffer.getvalue()
+    if len(data) >= os.stat(chart_path).st_size:
+        return None
+    return "data:image/webp;base64," + _b64encode(data).decode('ascii')
+
+
+@lru_cache(maxsize=16)
+def _chart_data_uri(chart_path: str, mtime_ns: int, size: int) -> str:  # pylint: disable=unused-argument
+    """
+    Codifica un gráfico como data URI, memorizado por ruta, fecha de modificación y tamaño.
+
+    Un gráfico que no ha cambiado desde el último reporte se reutiliza sin
+    volver a leerlo ni codificarlo. Los gráficos grandes se embeben como WebP
+    si así ocupan menos.
+
+    Args:
+        chart_path: Ruta al archivo PNG
+        mtime_ns: Fecha de modificación del archivo (solo forma parte de la clave)
+        size: Tamaño del archivo en bytes
+
+    Returns:
+        Cadena data:image/...;base64,...
+    """
+    data_uri = None
+    if size > _TRANSCODE_MIN_BYTES:
+        data_uri = _webp_data_uri(Path(chart_path))
+    return data_uri or _png_data_uri(Path(chart_path))
+
+
+def _weight_kg(weight: Optional[float]) -> Optional[float]:
+    """Normaliza un peso de Garmin a kg (los valores mayores de 500 vienen en gramos)."""
+    if weight and weight > 500:
+        return weight / 1000
+    return weight
+
+
+class _ActivityRow(NamedTuple):
+    """Fila de la tabla de actividades, con los valores ya recortados y formateados."""
+    name: str
+    activity_type: str
+    date: str
+    distance_km: str
+    duration_minutes: str
+    avg_heart_rate: Any
+
+
+def _project_activities(activities: List[Any]) -> List[_ActivityRow]:
+    """
+    Proyecta las últimas actividades a filas planas para la plantilla.
+
+    El formateo se hace aquí una sola vez, en Python, en lugar de con filtros
+    de Jinja dentro del bucle de la tabla.
+
+    Args:
+        activities: Lista de actividades
+
+    Returns:
+        Filas de las últimas _TABLE_ACTIVITIES actividades
+    """
+    return [
+        _ActivityRow(
+            name=act.name[:40],
+            activity_type=act.activity_type,
+            date=act.date[:10],
+            distance_km=f"{act.distance_km:.2f}",
+            duration_minutes=f"{act.duration_minutes:.0f}",
+            avg_heart_rate=act.avg_heart_rate or '-'
+        )
+        for act in activities[-_TABLE_ACTIVITIES:]
+    ]
+
+
+@lru_cache(maxsize=1)
+def _markdown_converter() -> Any:
+    """
+    Crea (una sola vez) el conversor de markdown con sus extensiones.
+
+    Cargar las extensiones y compilar sus expresiones regulares es la parte cara;
+    cada documento solo necesita reset() antes de convertirse.
+
+    Returns:
+        Instancia de markdown.Markdown
+    """
+    # Importación diferida: markdown y sus extensiones solo se cargan al generar un reporte
+    import markdown  # pylint: disable=import-outside-toplevel
+
+    return markdown.Markdown(extensions=['extra', 'nl2br', 'sane_lists'])
+
+
+# markdown.Markdown guarda estado por documento: una conversión a la vez
+_markdown_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _md_to_html(text: str) -> str:
+    """Convierte el análisis de markdown a HTML (memorizado: el mismo texto se renderiza a menudo varias veces)."""
+    with _markdown_lock:
+        return _markdown_converter().reset().convert(text)
 
 
 class HTMLReporter:  # pylint: disable=too-few-public-methods
     """
-    Genera reportes HTML con diseño responsive y gráficos embebidos.
+    Genera reportes HTML con diseño responsive y gráficos.
+
+    Por defecto los gráficos se enlazan como PNG junto al reporte y los estilos
+    como una hoja CSS compartida por todos los reportes del directorio; con
+    embed_assets=True se embeben ambos para obtener un único archivo
+    autocontenido (p. ej. para enviarlo por email).
 
     Las plantillas se cargan desde archivos externos en src/templates/:
     - report_template.html: Estructura HTML del reporte
     - report_styles.css: Estilos CSS del reporte
     """
 
-    def __init__(self, output_dir: str = "analysis_reports"):
+    def __init__(
+        self,
+        output_dir: str = "analysis_reports",
+        embed_assets: bool = False,
+        minify: bool = False,
+        compress: bool = False
+    ):
         """
         Inicializa el generador de reportes HTML.
 
-        Configura el directorio de salida y el entorno de plantillas Jinja2.
-        Las plantillas se cargan desde el directorio src/templates/.
+        Configura el directorio de salida y el entorno de plantillas Jinja2,
+        y compila la plantilla del reporte desde src/templates/.
 
         Args:
             output_dir: Directorio donde guardar los reportes
+            embed_assets: Si True, embebe los gráficos (en base64) y los estilos en el HTML
+            minify: Si True y minify-html está instalado, minifica el HTML (y el CSS
+                embebido) antes de guardarlo; por defecto se vuelca por fragmentos sin tocar
+            compress: Si True, guarda el reporte comprimido como .html.gz
 
         Raises:
             FileNotFoundError: Si el directorio de plantillas no existe
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.embed_assets = embed_assets
+        self.minify = minify
+        self.compress = compress
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # Initialize Jinja2 template environment
@@ -48,7 +310,32 @@ class HTMLReporter:  # pylint: disable=too-few-public-methods
                 f"Templates directory not found at {template_dir}. "
                 "Expected templates at src/templates/"
             )
-        self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+        # Entorno compartido por todas las instancias: la plantilla se compila una vez por proceso
+        self.jinja_env = _template_env(str(template_dir))
+        self.template = self.jinja_env.get_template('report_template.html')
+
+        # Hoja de estilos enlazada (None = estilos embebidos en cada reporte)
+        self.css_href = None if embed_assets else self._write_stylesheet(template_dir)
+
+    def _write_stylesheet(self, template_dir: Path) -> str:
+        """
+        Publica report_styles.css en output_dir con un nombre que depende de su contenido.
+
+        Solo se escribe si aún no existe, así que los reportes de un mismo
+        directorio comparten el archivo (y la caché del navegador).
+
+        Args:
+            template_dir: Directorio de plantillas
+
+        Returns:
+            Nombre del archivo CSS, relativo al reporte
+        """
+        css = (template_dir / 'report_styles.css').read_bytes()
+        css_name = f"report-{hashlib.blake2b(css, digest_size=8).hexdigest()}.css"
+        css_path = self.output_dir / css_name
+        if not css_path.exists():
+            css_path.write_bytes(css)
+        return css_name
 
     def generate_report(  # pylint: disable=too-many-positional-arguments,too-many-arguments
         self,
@@ -76,27 +363,41 @@ class HTMLReporter:  # pylint: disable=too-few-public-methods
             Path al archivo HTML generado
         """
         try:
-            # Convertir gráficos a base64 para embeber
+            # Enlazar los gráficos o convertirlos a base64 para embeber
             embedded_charts = self._embed_charts(charts)
 
             # Calcular estadísticas
             stats = self._calculate_stats(activities, body_composition)
 
-            # Renderizar template
-            html_content = self._render_template(
+            context = self._template_context(
                 activities,
                 analysis,
                 user_profile,
                 stats,
                 embedded_charts,
-                config,
-                timestamp
+                config
             )
 
-            # Guardar archivo
-            output_path = self.output_dir / f"reporte_{timestamp}.html"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # Renderizar y guardar: sin minificar, la plantilla se vuelca por fragmentos
+            # al archivo, sin montar el HTML completo (con todos los gráficos) en
+            # memoria. Se escribe aparte y se sustituye de forma atómica, así un fallo
+            # a mitad nunca deja un reporte truncado
+            suffix = '.html.gz' if self.compress else '.html'
+            output_path = self.output_dir / f"reporte_{timestamp}{suffix}"
+            tmp_path = output_path.with_name(output_path.name + '.tmp')
+            try:
+                with self._open_output(tmp_path) as f:
+                    if self.minify and minify_html is not None:
+                        f.write(minify_html.minify(
+                            self.template.render(**context),
+                            minify_css=True,
+                            keep_closing_tags=True
+                        ))
+                    else:
+                        f.writelines(self.template.generate(**context))
+                os.replace(tmp_path, output_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
 
             self.logger.info("Reporte HTML generado: %s", output_path)
             return output_path
@@ -105,28 +406,94 @@ class HTMLReporter:  # pylint: disable=too-few-public-methods
             self.logger.error("Error generando reporte HTML: %s", e)
             raise
 
+    def _open_output(self, path: Path) -> IO[str]:
+        """
+        Abre el archivo de salida del reporte en modo texto UTF-8.
+
+        Args:
+            path: Ruta del archivo a escribir
+
+        Returns:
+            Archivo de texto, comprimido con gzip si compress está activo
+        """
+        if self.compress:
+            return gzip.open(path, 'wt', compresslevel=_GZIP_LEVEL, encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')  # pylint: disable=consider-using-with
+
     def _embed_charts(self, charts: Dict[str, Path]) -> Dict[str, str]:
         """
-        Convierte las imágenes de gráficos a base64 para embeber en HTML.
+        Prepara las referencias a los gráficos para el HTML.
+
+        Sin embed_assets se enlazan por ruta relativa; si no, se leen y
+        codifican a base64 en paralelo.
 
         Args:
             charts: Diccionario con rutas de gráficos
 
         Returns:
-            Diccionario con gráficos en formato base64
+            Diccionario con la ruta relativa o el data URI de cada gráfico
         """
+        if not charts:
+            return {}
+        if not self.embed_assets:
+            return self._link_charts(charts)
+
         embedded = {}
+        with ThreadPoolExecutor(max_workers=min(_EMBED_WORKERS, len(charts))) as executor:
+            for chart_type, data_uri in executor.map(lambda item: self._embed_one(*item), charts.items()):
+                if data_uri:
+                    embedded[chart_type] = data_uri
+
+        return embedded
+
+    def _link_charts(self, charts: Dict[str, Path]) -> Dict[str, str]:
+        """
+        Referencia los gráficos por ruta relativa al directorio del reporte.
+
+        Los gráficos que no estén dentro de output_dir se copian a output_dir/assets.
+
+        Args:
+            charts: Diccionario con rutas de gráficos
+
+        Returns:
+            Diccionario con la ruta relativa (formato URL) de cada gráfico
+        """
+        linked = {}
+        output_dir = self.output_dir.resolve()
         for chart_type, chart_path in charts.items():
             try:
-                if chart_path.exists():
-                    with open(chart_path, 'rb') as f:
-                        img_data = f.read()
-                        base64_data = base64.b64encode(img_data).decode('utf-8')
-                        embedded[chart_type] = f"data:image/png;base64,{base64_data}"
+                chart_path = chart_path.resolve(strict=True)
+                if output_dir not in chart_path.parents:
+                    assets_dir = output_dir / "assets"
+                    assets_dir.mkdir(exist_ok=True)
+                    chart_path = Path(shutil.copyfile(chart_path, assets_dir / chart_path.name))
+                linked[chart_type] = chart_path.relative_to(output_dir).as_posix()
+            except FileNotFoundError:
+                self.logger.warning("Gráfico %s no encontrado: %s", chart_type, chart_path)
             except Exception as e:
-                self.logger.warning("No se pudo embeber gráfico %s: %s", chart_type, e)
+                self.logger.warning("No se pudo enlazar gráfico %s: %s", chart_type, e)
 
-        return embedded
+        return linked
+
+    def _embed_one(self, chart_type: str, chart_path: Path) -> Tuple[str, Optional[str]]:
+        """
+        Convierte un gráfico a data URI en base64.
+
+        Args:
+            chart_type: Tipo de gráfico
+            chart_path: Ruta al archivo PNG
+
+        Returns:
+            Tupla (tipo de gráfico, data URI o None si no existe o falla)
+        """
+        try:
+            stat = chart_path.stat()
+            return chart_type, _chart_data_uri(str(chart_path), stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            self.logger.warning("Gráfico %s no encontrado: %s", chart_type, chart_path)
+        except Exception as e:
+            self.logger.warning("No se pudo embeber gráfico %s: %s", chart_type, e)
+        return chart_type, None
 
     def _calculate_stats(
         self,
@@ -146,26 +513,29 @@ class HTMLReporter:  # pylint: disable=too-few-public-methods
         if not activities:
             return {}
 
-        total_distance = sum(act.distance_km for act in activities)
-        total_duration = sum(act.duration_minutes for act in activities)
-        total_calories = sum(act.calories or 0 for act in activities)
-
-        # Frecuencia cardíaca
-        hr_activities = [act for act in activities if act.avg_heart_rate]
-        avg_hr = sum(act.avg_heart_rate for act in hr_activities) / len(hr_activities) if hr_activities else 0
-
-        # Composición corporal
-        weight_start = None
-        weight_end = None
-        if body_composition and len(body_composition) > 0:
-            for measure in body_composition:
-                weight = measure.get('weight')
-                if weight and weight > 500:
-                    weight = weight / 1000
-                if weight:
-                    if weight_start is None:
-                        weight_start = weight
-                    weight_end = weight
+        # Una sola pasada sobre las actividades para todos los acumulados
+        total_distance = 0
+        total_duration = 0
+        total_calories = 0
+        hr_sum = 0
+        hr_count = 0
+        for act in activities:
+            total_distance += act.distance_km
+            total_duration += act.duration_minutes
+            total_calories += act.calories or 0
+            # Frecuencia cardíaca (solo actividades que la registran)
+            heart_rate = act.avg_heart_rate
+            if heart_rate:
+                hr_sum += heart_rate
+                hr_count += 1
+        avg_hr = hr_sum / hr_count if hr_count else 0
+
+        # Composición corporal: solo hacen falta la primera y la última medida con
+        # peso, así que se buscan desde cada extremo sin recorrer toda la lista
+        weights = (measure.get('weight') for measure in body_composition or ())
+        weight_start = _weight_kg(next((w for w in weights if w), None))
+        weights = (measure.get('weight') for measure in reversed(body_composition or ()))
+        weight_end = _weight_kg(next((w for w in weights if w), None))
 
         return {
             'total_activities': len(activities),
@@ -178,59 +548,50 @@ class HTMLReporter:  # pylint: disable=too-few-public-methods
             'weight_change': (weight_end - weight_start) if (weight_start and weight_end) else None
         }
 
-    def _render_template(  # pylint: disable=too-many-arguments,too-many-positional-arguments,unused-argument
+    def _template_context(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         activities: List[Any],
         analysis: str,
         user_profile: Dict[str, Any],
         stats: Dict[str, Any],
         charts: Dict[str, str],
-        config: Dict[str, Any],
-        timestamp: str
-    ) -> str:
+        config: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """
-        Renderiza el template HTML con los datos.
-
-        Carga la plantilla desde el archivo externo report_template.html ubicado
-        en src/templates/ y la renderiza con los datos proporcionados.
+        Prepara las variables de la plantilla report_template.html.
 
         Args:
             activities: Lista de actividades
             analysis: Análisis LLM
             user_profile: Perfil de usuario
             stats: Estadísticas calculadas
-            charts: Gráficos embebidos en base64
+            charts: Gráficos enlazados o embebidos en base64
             config: Configuración del análisis
-            timestamp: Timestamp del reporte
 
         Returns:
-            HTML renderizado
+            Diccionario con el contexto de renderizado
         """
-        # Load template from external file
-        template = self.jinja_env.get_template('report_template.html')
-
-        # Convertir el análisis de markdown a HTML
-        analysis_html = markdown.markdown(
-            analysis,
-            extensions=['extra', 'nl2br', 'sane_lists']
-        )
-
-        return template.render(
-            athlete_name=user_profile.get('name', 'Usuario'),
-            report_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            analysis_days=config.get('analysis_days', 30),
-            llm_provider=config.get('llm_provider', 'Unknown').upper(),
-            llm_model=config.get('llm_model', 'Unknown'),
-            total_activities=stats.get('total_activities', 0),
-            total_distance=stats.get('total_distance', 0),
-            total_duration=stats.get('total_duration', 0),
-            total_calories=stats.get('total_calories', 0),
-            avg_hr=stats.get('avg_hr', 0),
-            weight_change=stats.get('weight_change'),
-            activities=activities[-20:],
-            analysis=analysis_html,
-            charts=charts
-        )
+        avg_hr = stats.get('avg_hr', 0)
+        weight_change = stats.get('weight_change')
+        return {
+            'athlete_name': user_profile.get('name', 'Usuario'),
+            'report_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'analysis_days': config.get('analysis_days', 30),
+            'llm_provider': config.get('llm_provider', 'Unknown').upper(),
+            'llm_model': config.get('llm_model', 'Unknown'),
+            'total_activities': stats.get('total_activities', 0),
+            # Tarjetas de estadísticas ya formateadas (None = tarjeta oculta)
+            'total_distance': f"{stats.get('total_distance', 0):.2f}",
+            'total_hours': f"{stats.get('total_duration', 0) / 60:.0f}",
+            'total_calories': f"{stats.get('total_calories', 0):.0f}",
+            'avg_hr': f"{avg_hr:.0f}" if avg_hr > 0 else None,
+            'weight_change': f"{weight_change:.1f}" if weight_change else None,
+            'css_href': self.css_href,
+            'activities': _project_activities(activities),
+            # Convertir el análisis de markdown a HTML
+            'analysis': _md_to_html(analysis),
+            'charts': charts
+        }
 
 
 if __name__ == "__main__":
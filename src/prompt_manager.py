@@ -192,16 +192,16 @@ class PromptManager:
 
         if not file_path.exists():
             error_msg = f"Archivo de prompt no encontrado: {file_path}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             raise FileNotFoundError(error_msg)
 
         try:
             content = file_path.read_text(encoding='utf-8')
-            logger.debug(f"✅ Prompt cargado: {filename} ({len(content)} caracteres)")
+            logger.debug("✅ Prompt cargado: %s (%d caracteres)", filename, len(content))
             return content
         except Exception as e:
             error_msg = f"Error leyendo archivo de prompt {filename}: {e}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             raise
 
 
@@ -0,0 +1,186 @@
+"""
+Utilidades para llamar a APIs remotas: reintentos con backoff y limitación de ritmo.
+"""
+
+import asyncio
+import inspect
+import random
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Optional
+
+
+# Códigos HTTP transitorios que merece la pena reintentar
+_RETRY_ON_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+def _http_response(exc: BaseException) -> Optional[Any]:
+    """
+    Busca la respuesta HTTP asociada a una excepción.
+
+    garth y garminconnect envuelven el HTTPError de requests (en `error` o
+    como causa), así que se recorre esa cadena hasta encontrar `response`. No
+    se sigue __context__: la excepción que se estuviera tratando al lanzar
+    esta puede no tener nada que ver con ella.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        response = getattr(exc, 'response', None)
+        if response is not None:
+            return response
+        exc = getattr(exc, 'error', None) or exc.__cause__
+    return None
+
+
+def _retry_after_seconds(response: Any) -> Optional[float]:
+    """Devuelve la cabecera Retry-After en segundos, o None si no viene o no es numérica."""
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_with_backoff(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    backoff_factor: float = 2.0,
+    exceptions: tuple = (Exception,),
+    max_delay: float = 30.0,
+    jitter: float = 0.5,
+    retry_on_status: tuple = _RETRY_ON_STATUS,
+    unrecoverable: tuple = ()
+):
+    """
+    Decorador para reintentar funciones con backoff exponencial.
+
+    Cada espera se recorta a max_delay y se reduce aleatoriamente hasta una
+    fracción jitter ("equal jitter") para que los reintentos de varios hilos o
+    procesos no se sincronicen contra la API. Si el error trae
+    una respuesta HTTP, solo se reintenta con los códigos de retry_on_status y
+    se respeta la cabecera Retry-After (hasta max_delay). Las corrutinas se
+    decoran con un wrapper asíncrono que espera con asyncio.sleep.
+
+    Args:
+        max_retries: Número máximo de reintentos
+        initial_delay: Delay inicial en segundos
+        backoff_factor: Factor de multiplicación del delay
+        exceptions: Tupla de excepciones a capturar
+        max_delay: Delay máximo en segundos
+        jitter: Fracción de cada espera que se aleatoriza (0 la desactiva)
+        retry_on_status: Códigos HTTP que se reintentan; el resto se propaga al momento
+        unrecoverable: Excepciones que se propagan sin reintentar aunque estén en exceptions
+
+    Returns:
+        Función decorada con retry
+    """
+    def decorator(func: Callable) -> Callable:
+        def next_delay(e: Exception, attempt: int, delay: float, args: tuple) -> Optional[float]:
+            """Decide la espera antes del siguiente intento (None si no quedan intentos)."""
+            response = _http_response(e)
+            status = getattr(response, 'status_code', None)
+            if status is not None and status not in retry_on_status:
+                # Error definitivo (p. ej. 401/404): reintentar no sirve
+                raise e
+
+            # Obtener logger si está disponible
+            logger = args[0].logger if args and hasattr(args[0], 'logger') else None
+
+            if attempt >= max_retries:
+                # Último intento fallido
+                if logger:
+                    logger.error(
+                        "Error en %s después de %d intentos: %s",
+                        func.__name__, max_retries + 1, e
+                    )
+                return None
+
+            sleep_for = min(delay, max_delay) * random.uniform(1.0 - jitter, 1.0)
+            retry_after = _retry_after_seconds(response) if response is not None else None
+            if retry_after is not None:
+                sleep_for = min(max(sleep_for, retry_after), max_delay)
+
+            if logger:
+                logger.warning(
+                    "Error en %s (intento %d/%d): %s. Reintentando en %.1fs...",
+                    func.__name__, attempt + 1, max_retries + 1, e, sleep_for
+                )
+            return sleep_for
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                delay = initial_delay
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except unrecoverable:
+                        raise
+                    except exceptions as e:
+                        sleep_for = next_delay(e, attempt, delay, args)
+                        if sleep_for is None:
+                            raise
+                    # Espera sin bloquear el event loop
+                    await asyncio.sleep(sleep_for)
+                    delay = min(delay * backoff_factor, max_delay)
+                return None  # inalcanzable: el último intento devuelve o lanza
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            delay = initial_delay
+            for attempt in range(max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except unrecoverable:
+                    raise
+                except exceptions as e:
+                    sleep_for = next_delay(e, attempt, delay, args)
+                    if sleep_for is None:
+                        raise
+                time.sleep(sleep_for)
+                delay = min(delay * backoff_factor, max_delay)
+            return None  # inalcanzable: el último intento devuelve o lanza
+
+        return wrapper
+    return decorator
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """
+    Limitador de peticiones por segundo compartido entre hilos.
+
+    Acumula hasta burst fichas que se reponen a rate por segundo; cada
+    petición consume una y, si no quedan, espera a la siguiente.
+    """
+
+    __slots__ = ('rate', 'burst', '_tokens', '_updated', '_condition')
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Inicializa el limitador con el cubo lleno.
+
+        Args:
+            rate: Peticiones por segundo sostenidas
+            burst: Peticiones que pueden salir seguidas sin esperar
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Consume una ficha, esperando (sin retener el lock) hasta que haya una disponible."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self._condition.wait((1 - self._tokens) / self.rate)
@@ -8,6 +8,26 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Fixture que redirige el caché SQLite por defecto a un directorio temporal."""
+    cache_dir = tmp_path / ".cache"
+    monkeypatch.setattr("src.cache_manager.DEFAULT_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_template_bytecode_cache(tmp_path, monkeypatch):
+    """Fixture que redirige el bytecode de las plantillas Jinja2 a un directorio temporal."""
+    from src.html_reporter import _template_env
+
+    cache_dir = tmp_path / "jinja"
+    monkeypatch.setattr("src.html_reporter._BYTECODE_CACHE_DIR", cache_dir)
+    _template_env.cache_clear()
+    yield cache_dir
+    _template_env.cache_clear()
+
+
 @pytest.fixture
 def mock_env_vars(monkeypatch):
     """Fixture que establece variables de entorno de prueba."""
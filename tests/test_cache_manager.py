@@ -3,6 +3,11 @@ Tests for the cache manager (src/cache_manager.py).
 """
 # pylint: disable=protected-access
 
+import gc
+import os
+import weakref
+from datetime import timedelta
+
 import pytest
 
 from src.cache_manager import CacheManager
@@ -233,3 +238,180 @@ class TestCacheManager:
         assert "cache_dir" in stats
         assert "db_size_bytes" in stats
         assert stats["db_size_bytes"] > 0  # DB has some size after adding data
+
+    def test_connection_is_reused_across_operations(self, cache):
+        """Test that all operations share the same persistent connection."""
+        # Act
+        with cache._get_connection() as first:
+            pass
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 1}])
+        with cache._get_connection() as second:
+            pass
+
+        # Assert
+        assert first is second
+        assert cache.get_activities("2024-01-01", "2024-01-31") == [{"id": 1}]
+
+    def test_database_uses_wal_journal(self, cache):
+        """Test that the cache database is configured in WAL mode."""
+        # Act
+        with cache._get_connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        # Assert
+        assert journal_mode == "wal"
+
+    def test_payload_is_compressed_and_legacy_rows_readable(self, cache):
+        """Test that payloads are stored compressed and plain JSON rows still load."""
+        # Arrange
+        activities = [{"id": i, "name": "Morning Run"} for i in range(50)]
+        cache.set_activities("2024-01-01", "2024-01-31", activities)
+
+        # Act
+        with cache._get_connection() as conn:
+            stored = conn.execute("SELECT data FROM cache WHERE kind = 'activities'").fetchone()[0]
+
+        # Assert - Stored as a zstd frame, decoded transparently
+        assert stored[:4] == b"\x28\xb5\x2f\xfd"
+        assert cache._decode(stored) == activities
+        assert cache._decode(b'[{"id": 1}]') == [{"id": 1}]
+
+    def test_cache_key_is_stable_signed_integer(self, cache):
+        """Test that cache keys are deterministic 64-bit signed integers."""
+        # Act
+        key = cache._generate_cache_key("activities", start_date="2024-01-01", end_date="2024-01-31")
+        same = cache._generate_cache_key("activities", end_date="2024-01-31", start_date="2024-01-01")
+        other = cache._generate_cache_key("body_composition", start_date="2024-01-01", end_date="2024-01-31")
+
+        # Assert
+        assert isinstance(key, int)
+        assert -(2 ** 63) <= key < 2 ** 63
+        assert key == same
+        assert key != other
+
+    def test_memory_cache_serves_repeated_reads(self, cache):
+        """Test that repeated reads are served from the in-memory LRU."""
+        # Arrange
+        activities = [{"id": 1, "name": "Run"}]
+        cache.set_activities("2024-01-01", "2024-01-31", activities)
+
+        # Act - Remove the row behind the LRU's back
+        with cache._get_connection() as conn:
+            conn.execute("DELETE FROM cache")
+
+        # Assert - Still served from memory
+        assert cache.get_activities("2024-01-01", "2024-01-31") == activities
+
+    def test_memory_cache_returns_independent_copies(self, cache):
+        """Test that mutating a returned value does not change later cache hits."""
+        # Arrange
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 1, "name": "Run"}])
+
+        # Act - Mutate the value returned by a memory hit
+        first = cache.get_activities("2024-01-01", "2024-01-31")
+        first[0]["name"] = "Changed"
+        first.append({"id": 2})
+
+        # Assert
+        assert cache.get_activities("2024-01-01", "2024-01-31") == [{"id": 1, "name": "Run"}]
+
+    def test_memory_cache_is_bounded(self, tmp_path):
+        """Test that the in-memory LRU evicts the least recently used entries."""
+        # Arrange
+        cache = CacheManager(cache_dir=str(tmp_path / "lru"), ttl_hours=24, memory_cache_size=2)
+
+        # Act
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 1}])
+        cache.set_activities("2024-02-01", "2024-02-28", [{"id": 2}])
+        cache.set_activities("2024-03-01", "2024-03-31", [{"id": 3}])
+
+        # Assert - Only the two most recent entries remain in memory
+        assert len(cache._memory) == 2
+        assert cache.get_activities("2024-01-01", "2024-01-31") == [{"id": 1}]
+
+    def test_set_overwrites_existing_entry(self, cache):
+        """Test that storing the same key twice keeps a single, updated row."""
+        # Act
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 1}])
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 2}])
+        cache._memory.clear()
+
+        # Assert
+        assert cache.get_activities("2024-01-01", "2024-01-31") == [{"id": 2}]
+        assert cache.get_cache_stats()["activities"]["total"] == 1
+
+    def test_clear_expired_releases_free_pages(self, tmp_path):
+        """Test that clear_expired reclaims pages freed by deleted entries."""
+        # Arrange - Large expired payloads spread over many pages
+        cache = CacheManager(cache_dir=str(tmp_path / "vacuum"), ttl_hours=0)
+        for month in range(1, 13):
+            cache.set_activities(f"2024-{month:02d}-01", f"2024-{month:02d}-28",
+                                 [{"id": i, "notes": os.urandom(512).hex()} for i in range(20)])
+
+        # Act
+        cache.clear_expired()
+
+        # Assert
+        with cache._get_connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    def test_maybe_vacuum_respects_threshold(self, cache):
+        """Test that maybe_vacuum only runs VACUUM above the size threshold."""
+        # Arrange
+        cache.set_activities("2024-01-01", "2024-01-31", [{"id": 1}])
+
+        # Act / Assert
+        assert cache.maybe_vacuum() is False
+        assert cache.maybe_vacuum(threshold_bytes=0) is True
+        assert cache.get_activities("2024-01-01", "2024-01-31") == [{"id": 1}]
+
+    def test_generic_entries_round_trip_with_custom_ttl(self, cache):
+        """Test that get_entry/set_entry store arbitrary API responses per kind."""
+        # Arrange
+        stats = {"calendarDate": "2024-01-01", "totalSteps": 12000}
+
+        # Act
+        cache.set_entry("daily_stats", {"date": "2024-01-01"}, stats, ttl=timedelta(days=365))
+        cache._memory.clear()
+
+        # Assert
+        assert cache.get_entry("daily_stats", {"date": "2024-01-01"}) == stats
+        assert cache.get_entry("daily_stats", {"date": "2024-01-02"}) is None
+        assert cache.get_cache_stats()["daily_stats"]["valid"] == 1
+
+    def test_entries_persist_across_runs(self, tmp_path):
+        """Test that a new CacheManager on the same directory reuses the previous run's entries."""
+        # Arrange - A first "run" stores a long-lived entry and closes
+        first_run = CacheManager(cache_dir=str(tmp_path / "shared"), ttl_hours=24)
+        first_run.set_entry("activity_details", {"activity_id": "1"}, {"id": 1}, ttl=timedelta(days=30))
+        first_run.close()
+
+        # Act - A later run opens the same directory
+        second_run = CacheManager(cache_dir=str(tmp_path / "shared"), ttl_hours=24)
+
+        # Assert
+        assert second_run.get_entry("activity_details", {"activity_id": "1"}) == {"id": 1}
+        assert [p.name for p in (tmp_path / "shared").glob("*.db")] == ["garmin_cache.db"]
+
+    def test_cache_manager_can_be_garbage_collected(self, tmp_path):
+        """Test that an unreferenced CacheManager is collected and its connection closed."""
+        # Arrange
+        cache = CacheManager(cache_dir=str(tmp_path / "gc"), ttl_hours=24)
+        cache.set_entry("activity_details", {"activity_id": "1"}, {"id": 1}, ttl=timedelta(days=30))
+        ref = weakref.ref(cache)
+        finalizer = cache._finalizer
+
+        # Act
+        del cache
+        gc.collect()
+
+        # Assert
+        assert ref() is None
+        assert not finalizer.alive
+
+    def test_default_cache_dir(self, isolated_cache_dir):
+        """Test that the cache uses DEFAULT_CACHE_DIR when no directory is given."""
+        cache = CacheManager()
+
+        assert cache.db_path == isolated_cache_dir / "garmin_cache.db"
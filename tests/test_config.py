@@ -130,3 +130,66 @@ class TestConfig:
         assert TestConfig.MAX_TOKENS == 3000
         assert TestConfig.TEMPERATURE == 0.7
         assert TestConfig.LLM_PROVIDER == 'anthropic'
+
+    def test_load_is_memoized_per_environment(self, mock_env_vars, monkeypatch):
+        """Test que load reutiliza la instancia mientras el entorno no cambie."""
+        from src.config import Config as TestConfig
+        TestConfig.clear_cache()
+
+        first = TestConfig.load()
+        second = TestConfig.load()
+        monkeypatch.setenv('ANALYSIS_DAYS', '14')
+        third = TestConfig.load()
+
+        assert first is second
+        assert third is not first
+        assert third.analysis_days == 14
+        assert TestConfig.ANALYSIS_DAYS == 14
+
+    def test_load_env_file_does_not_mutate_environ(self, mock_env_vars, monkeypatch, tmp_path):
+        """Test que load lee el .env sin modificar os.environ."""
+        import os
+        from src.config import Config as TestConfig
+        monkeypatch.delenv('GOOGLE_MODEL', raising=False)
+        env_file = tmp_path / '.env'
+        env_file.write_text('GOOGLE_MODEL=gemini-test\nGARMIN_EMAIL=file@example.com\n')
+
+        instance = TestConfig.load(env_file=str(env_file))
+
+        assert instance.google_model == 'gemini-test'
+        assert instance.garmin_email == 'test@example.com'  # El entorno tiene prioridad
+        assert 'GOOGLE_MODEL' not in os.environ
+
+    def test_get_llm_config_is_shared_and_read_only(self, mock_env_vars):
+        """Test que get_llm_config devuelve la misma vista inmutable en cada llamada."""
+        from src.config import Config as TestConfig
+        TestConfig.load()
+
+        llm_config = TestConfig.get_llm_config()
+
+        assert TestConfig.get_llm_config() is llm_config
+        with pytest.raises(TypeError):
+            llm_config['model'] = 'other'  # type: ignore[index]
+
+    def test_config_schema_is_frozen_and_normalized(self):
+        """Test que ConfigSchema es inmutable y normaliza el proveedor."""
+        from dataclasses import FrozenInstanceError
+        from src.config import ConfigSchema
+
+        schema = ConfigSchema(llm_provider='OpenAI')
+
+        assert schema.llm_provider == 'openai'
+        assert hash(schema) == hash(ConfigSchema(llm_provider='openai'))
+        with pytest.raises(FrozenInstanceError):
+            schema.llm_provider = 'google'  # type: ignore[misc]
+
+    def test_legacy_paths_are_resolved_lazily(self, monkeypatch):
+        """Test que OUTPUT_DIR se resuelve en el primer acceso y no al importar."""
+        from src.config import Config as TestConfig
+        monkeypatch.setenv('OUTPUT_DIR', 'lazy_reports')
+        TestConfig.clear_cache()
+
+        assert 'OUTPUT_DIR' not in vars(TestConfig)
+        assert TestConfig.OUTPUT_DIR == TestConfig.BASE_DIR / 'lazy_reports'
+        assert TestConfig.LOG_FILE.name == 'training_analyzer.log'
+        TestConfig.clear_cache()
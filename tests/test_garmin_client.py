@@ -3,21 +3,28 @@ Tests para el cliente de Garmin (src/garmin_client.py).
 """
 # pylint: disable=unused-argument
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
 import pytest
+from garminconnect import GarminConnectAuthenticationError, GarminConnectConnectionError
 
+from src.cache_manager import CacheManager
 from src.garmin_client import GarminClient
+from src.retry import TokenBucket, retry_with_backoff
 
 
 class TestGarminClient:
     """Tests para la clase GarminClient."""
 
     @pytest.fixture
-    def garmin_client(self):
+    def garmin_client(self, tmp_path):
         """Fixture que crea una instancia de GarminClient."""
-        return GarminClient('test@example.com', 'test_password')
+        return GarminClient('test@example.com', 'test_password', token_dir=str(tmp_path / 'tokens'))
 
     def test_init(self, garmin_client):
         """Test que GarminClient se inicializa correctamente."""
@@ -25,6 +32,12 @@ class TestGarminClient:
         assert garmin_client.password == 'test_password'
         assert garmin_client.client is None
 
+    def test_instances_have_no_dict(self, garmin_client):
+        """Test que GarminClient usa __slots__ y rechaza atributos no declarados."""
+        assert not hasattr(garmin_client, '__dict__')
+        with pytest.raises(AttributeError):
+            garmin_client.unexpected = True  # pylint: disable=attribute-defined-outside-init
+
     @patch('src.garmin_client.Garmin')
     def test_connect_success(self, mock_garmin_class, garmin_client):
         """Test que connect establece conexión exitosamente."""
@@ -37,6 +50,59 @@ class TestGarminClient:
         assert garmin_client.client is not None
         mock_instance.login.assert_called_once()
 
+    @patch('src.garmin_client.Garmin')
+    def test_connect_saves_session_and_configures_pool(self, mock_garmin_class, garmin_client):
+        """Test que connect persiste los tokens y configura el pool HTTP."""
+        mock_instance = MagicMock()
+        mock_garmin_class.return_value = mock_instance
+
+        garmin_client.connect()
+
+        mock_instance.login.assert_called_once_with()
+        mock_instance.garth.dump.assert_called_once_with(str(garmin_client.token_dir))
+        mock_instance.garth.configure.assert_called_once()
+
+    @patch('src.garmin_client.Garmin')
+    def test_connect_mounts_adapter_without_garth_configure(self, mock_garmin_class, garmin_client):
+        """Test que connect monta el HTTPAdapter si garth.configure no admite el pool."""
+        mock_instance = MagicMock()
+        mock_instance.garth.configure.side_effect = TypeError("unexpected keyword argument")
+        mock_garmin_class.return_value = mock_instance
+
+        result = garmin_client.connect()
+
+        assert result is True
+        prefix, adapter = mock_instance.garth.sess.mount.call_args.args
+        assert prefix == "https://"
+        assert adapter.max_retries.total == 3
+
+    @patch('src.garmin_client.Garmin')
+    def test_connect_reuses_saved_session(self, mock_garmin_class, garmin_client):
+        """Test que connect reutiliza los tokens guardados sin login completo."""
+        garmin_client.token_dir.mkdir(parents=True)
+        mock_instance = MagicMock()
+        mock_garmin_class.return_value = mock_instance
+
+        result = garmin_client.connect()
+
+        assert result is True
+        mock_instance.login.assert_called_once_with(tokenstore=str(garmin_client.token_dir))
+        mock_instance.garth.dump.assert_not_called()
+
+    @patch('src.garmin_client.Garmin')
+    def test_connect_falls_back_to_credentials(self, mock_garmin_class, garmin_client):
+        """Test que connect hace login con credenciales si la sesión guardada falla."""
+        garmin_client.token_dir.mkdir(parents=True)
+        mock_instance = MagicMock()
+        mock_instance.login.side_effect = [Exception("Token expired"), None]
+        mock_garmin_class.return_value = mock_instance
+
+        result = garmin_client.connect()
+
+        assert result is True
+        assert mock_instance.login.call_count == 2
+        mock_instance.garth.dump.assert_called_once()
+
     @patch('src.garmin_client.Garmin')
     def test_connect_failure(self, mock_garmin_class, garmin_client):
         """Test que connect maneja errores correctamente."""
@@ -130,6 +196,271 @@ class TestGarminClient:
         assert len(result) == 2
         assert result == sample_body_composition
 
+    def test_get_user_profile_failure_is_not_memoized(self, garmin_client):
+        """Test que un perfil no disponible devuelve el valor por defecto sin memorizarlo."""
+        mock_client = MagicMock()
+        mock_client.get_full_name.side_effect = [RuntimeError("sesión inválida"), "Test User"]
+        mock_client.get_unit_system.return_value = "metric"
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        first = garmin_client.get_user_profile()
+        second = garmin_client.get_user_profile()
+
+        assert first == {"name": "Usuario", "unit_system": "metric"}
+        assert second == {"name": "Test User", "unit_system": "metric"}
+        assert mock_client.get_full_name.call_count == 2
+
+    def test_session_data_is_memoized_until_invalidated(self, garmin_client):
+        """Test que perfil y dispositivos se consultan una vez por sesión."""
+        mock_client = MagicMock()
+        mock_client.get_full_name.return_value = "Test User"
+        mock_client.get_devices.return_value = [{'deviceId': 1}]
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        garmin_client.get_user_profile()
+        garmin_client.get_user_profile()
+        garmin_client.get_devices()
+        garmin_client.get_devices()
+        garmin_client.invalidate_cache()
+        garmin_client.get_devices()
+
+        mock_client.get_full_name.assert_called_once()
+        assert mock_client.get_devices.call_count == 2
+
+    @patch('src.garmin_client.Garmin')
+    def test_reconnect_invalidates_session_data(self, mock_garmin_class, garmin_client):
+        """Test que reconectar descarta el perfil memorizado de la sesión anterior."""
+        mock_garmin_class.return_value.get_full_name.return_value = "Test User"
+        garmin_client.use_cache = False
+
+        garmin_client.connect()
+        garmin_client.get_user_profile()
+        garmin_client.connect()
+        garmin_client.get_user_profile()
+
+        assert mock_garmin_class.return_value.get_full_name.call_count == 2
+
+    def test_historical_daily_stats_are_cached_on_disk(self, garmin_client, tmp_path):
+        """Test que las stats de días cerrados se sirven desde el caché en disco."""
+        garmin_client.cache = CacheManager(cache_dir=str(tmp_path / 'cache'))
+        mock_client = MagicMock()
+        mock_client.get_stats.return_value = {'totalSteps': 10000}
+        garmin_client.client = mock_client
+        past_day = datetime.now() - timedelta(days=10)
+
+        first = garmin_client.get_daily_stats(past_day)
+        second = garmin_client.get_daily_stats(past_day)
+        garmin_client.get_daily_stats(datetime.now())
+        garmin_client.get_daily_stats(datetime.now())
+
+        assert first == second == {'totalSteps': 10000}
+        assert mock_client.get_stats.call_count == 3  # 1 histórico + 2 del día en curso
+
+    def test_long_activity_ranges_are_fetched_in_cached_windows(self, garmin_client, tmp_path):
+        """Test que un rango largo se pide por ventanas y cada ventana se cachea."""
+        garmin_client.cache = CacheManager(cache_dir=str(tmp_path / 'cache'))
+        mock_client = MagicMock()
+        mock_client.get_activities_by_date.side_effect = lambda start, end: [{'start': start, 'end': end}]
+        garmin_client.client = mock_client
+        end_date = datetime.now() - timedelta(days=10)
+        start_date = end_date - timedelta(days=90)
+
+        first = garmin_client.get_activities(start_date, end_date)
+        windows = mock_client.get_activities_by_date.call_count
+        second = garmin_client.get_activities(start_date, end_date)
+
+        assert windows >= 4
+        assert first == second
+        assert first[0]['end'] == end_date.date().isoformat()
+        assert first[-1]['start'] == start_date.date().isoformat()
+        assert mock_client.get_activities_by_date.call_count == windows
+
+    def test_long_activity_ranges_keep_newest_first_order(self, garmin_client):
+        """Test que al unir las ventanas el resultado sigue ordenado de más reciente a más antiguo."""
+        garmin_client.use_cache = False
+        mock_client = MagicMock()
+
+        def activities_by_date(start, end):
+            first = datetime.fromisoformat(start)
+            days = (datetime.fromisoformat(end) - first).days
+            return [{'startTimeLocal': (first + timedelta(days=d)).strftime('%Y-%m-%d 08:00:00')}
+                    for d in range(days, -1, -1)]
+
+        mock_client.get_activities_by_date.side_effect = activities_by_date
+        garmin_client.client = mock_client
+
+        result = garmin_client.get_activities(datetime(2026, 6, 1), datetime(2026, 8, 30))
+        dates = [a['startTimeLocal'] for a in result]
+
+        assert mock_client.get_activities_by_date.call_count >= 4
+        assert len(dates) == 91
+        assert dates == sorted(dates, reverse=True)
+
+    def test_empty_responses_are_cached_briefly(self, garmin_client, tmp_path):
+        """Test que los días sin datos se recuerdan con un TTL corto y devuelven None."""
+        garmin_client.cache = CacheManager(cache_dir=str(tmp_path / 'cache'))
+        mock_client = MagicMock()
+        mock_client.get_body_battery.return_value = None
+        mock_client.get_body_composition.return_value = []
+        garmin_client.client = mock_client
+        past_day = datetime.now() - timedelta(days=10)
+
+        assert garmin_client.get_body_battery(past_day) is None
+        assert garmin_client.get_body_battery(past_day) is None
+        assert garmin_client.get_body_composition(past_day, past_day) == []
+        assert garmin_client.get_body_composition(past_day, past_day) == []
+
+        mock_client.get_body_battery.assert_called_once()
+        mock_client.get_body_composition.assert_called_once()
+        with patch('src.cache_manager.time.time', return_value=time.time() + 2 * 3600):
+            garmin_client.get_body_battery(past_day)
+        assert mock_client.get_body_battery.call_count == 2
+
+    def test_activity_details_are_cached_with_long_ttl(self, garmin_client, tmp_path):
+        """Test que los detalles de actividad se cachean en disco con su propio TTL."""
+        garmin_client.cache = CacheManager(cache_dir=str(tmp_path / 'cache'), ttl_hours=24)
+        mock_client = MagicMock()
+        mock_client.get_activity.return_value = {'activityId': 1}
+        garmin_client.client = mock_client
+
+        garmin_client.get_activity_details('1')
+        garmin_client.invalidate_cache()
+        result = garmin_client.get_activity_details('1')
+
+        assert result == {'activityId': 1}
+        mock_client.get_activity.assert_called_once_with('1')
+        with garmin_client.cache._get_connection() as conn:  # pylint: disable=protected-access
+            created_at, expires_at = conn.execute(
+                "SELECT created_at, expires_at FROM cache WHERE kind = 'activity_details'"
+            ).fetchone()
+        assert expires_at - created_at == 30 * 24 * 3600
+
+    def test_get_gear_uses_profile_id_and_disk_cache(self, garmin_client, tmp_path):
+        """Test que get_gear usa el profileId de garth y cachea el resultado en disco."""
+        garmin_client.cache = CacheManager(cache_dir=str(tmp_path / 'cache'))
+        mock_client = MagicMock()
+        mock_client.garth.profile = {'profileId': 12345}
+        mock_client.get_gear.return_value = [{'displayName': 'Shoes'}]
+        garmin_client.client = mock_client
+
+        first = garmin_client.get_gear()
+        garmin_client.invalidate_cache()
+        second = garmin_client.get_gear()
+
+        assert first == second == [{'displayName': 'Shoes'}]
+        mock_client.get_gear.assert_called_once_with(userProfileNumber='12345')
+
+    @patch('src.retry.time.sleep')
+    def test_get_gear_retries_lazy_profile_lookup(self, mock_sleep, garmin_client):
+        """Test que la lectura perezosa de garth.profile pasa por el limitador y se reintenta."""
+        mock_client = MagicMock()
+        type(mock_client.garth).profile = PropertyMock(
+            side_effect=[AssertionError("respuesta no es un dict"), {'profileId': 7}]
+        )
+        mock_client.get_gear.return_value = [{'displayName': 'Shoes'}]
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+        garmin_client._bucket = MagicMock(spec=TokenBucket)
+
+        assert garmin_client.get_gear() == [{'displayName': 'Shoes'}]
+
+        mock_client.get_gear.assert_called_once_with(userProfileNumber='7')
+        mock_sleep.assert_called_once()
+        assert garmin_client._bucket.acquire.call_count == 3  # dos lecturas del perfil y get_gear
+
+    @patch('src.retry.time.sleep')
+    def test_get_gear_profile_failure_is_not_memoized(self, mock_sleep, garmin_client):
+        """Test que un fallo al leer el perfil devuelve [] sin memorizarlo para la sesión."""
+        mock_client = MagicMock()
+        type(mock_client.garth).profile = PropertyMock(
+            side_effect=[AssertionError("respuesta no es un dict")] * 4 + [{'profileId': 42}]
+        )
+        mock_client.get_gear.return_value = [{'displayName': 'Bike'}]
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        assert garmin_client.get_gear() == []
+        assert garmin_client.get_gear() == [{'displayName': 'Bike'}]
+        mock_client.get_gear.assert_called_once_with(userProfileNumber='42')
+
+    def test_get_gear_without_user_id_short_circuits(self, garmin_client):
+        """Test que sin ID de perfil get_gear no consulta la API ni repite la búsqueda."""
+        mock_client = MagicMock()
+        mock_client.garth.profile = {}
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        assert garmin_client.get_gear() == []
+        mock_client.garth.profile = {'profileId': 42}
+        assert garmin_client.get_gear() == []
+
+        mock_client.get_gear.assert_not_called()
+        mock_client.get_full_name.assert_not_called()
+
+    def test_get_body_composition_unknown_format(self, garmin_client):
+        """Test que get_body_composition devuelve el dict completo si no reconoce la estructura."""
+        mock_client = MagicMock()
+        mock_client.get_body_composition.return_value = {'totalAverage': {'weight': 75000}}
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        result = garmin_client.get_body_composition(datetime(2025, 11, 1), datetime(2025, 11, 8))
+
+        assert result == [{'totalAverage': {'weight': 75000}}]
+
+    def test_get_activity_details_bulk(self, garmin_client):
+        """Test que get_activity_details_bulk devuelve los detalles por ID."""
+        mock_client = MagicMock()
+        mock_client.get_activity.side_effect = lambda activity_id: {'activityId': activity_id}
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        result = garmin_client.get_activity_details_bulk(['1', '2', '3'])
+        with patch('src.garmin_client.ThreadPoolExecutor') as mock_executor:
+            again = garmin_client.get_activity_details_bulk(['1', '2', '3'])
+
+        assert result == again == {str(i): {'activityId': str(i)} for i in range(1, 4)}
+        assert mock_client.get_activity.call_count == 3
+        mock_executor.assert_not_called()
+
+    def test_concurrent_identical_requests_share_one_api_call(self, garmin_client):
+        """Test que varios hilos pidiendo los mismos splits generan una sola llamada a la API."""
+        barrier = threading.Barrier(4)
+
+        def slow_splits(activity_id):
+            time.sleep(0.1)
+            return {'activityId': activity_id}
+
+        mock_client = MagicMock()
+        mock_client.get_activity_splits.side_effect = slow_splits
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+
+        def request(_):
+            barrier.wait()
+            return garmin_client.get_activity_splits('123')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(request, range(4)))
+
+        assert results == [{'activityId': '123'}] * 4
+        mock_client.get_activity_splits.assert_called_once_with('123')
+
+    def test_async_getters_can_be_gathered(self, garmin_client):
+        """Test que las variantes a_* devuelven lo mismo que los getters síncronos."""
+        mock_client = MagicMock()
+        mock_client.get_stats.side_effect = lambda day: {'day': day}
+        garmin_client.client = mock_client
+        garmin_client.use_cache = False
+        dates = [datetime(2025, 10, 1), datetime(2025, 10, 2)]
+
+        async def gather():
+            return await asyncio.gather(*[garmin_client.a_get_daily_stats(d) for d in dates])
+
+        assert asyncio.run(gather()) == [{'day': '2025-10-01'}, {'day': '2025-10-02'}]
+
     def test_get_activity_details_without_connection(self, garmin_client):
         """Test que get_activity_details retorna None sin conexión."""
         result = garmin_client.get_activity_details('12345')
@@ -147,3 +478,140 @@ class TestGarminClient:
 
         assert result == sample_activity_data
         mock_client.get_activity.assert_called_once_with('12345')
+
+
+class TestTokenBucket:
+    """Tests para el limitador de peticiones compartido."""
+
+    def test_burst_is_immediate_then_rate_limited(self):
+        """Test que la ráfaga inicial no espera y las siguientes peticiones sí."""
+        bucket = TokenBucket(rate=50.0, burst=3)
+
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        burst_elapsed = time.monotonic() - start
+        for _ in range(5):
+            bucket.acquire()
+        total_elapsed = time.monotonic() - start
+
+        assert burst_elapsed < 0.05
+        assert total_elapsed >= 0.09  # 5 fichas a 50/s
+
+
+class TestRetryWithBackoff:
+    """Tests para el decorador retry_with_backoff."""
+
+    @patch('src.retry.time.sleep')
+    def test_delays_are_jittered_and_capped(self, mock_sleep):
+        """Test que las esperas se aleatorizan dentro de [1 - jitter, 1] del delay y nunca superan max_delay."""
+        calls = []
+
+        @retry_with_backoff(max_retries=4, initial_delay=10.0, backoff_factor=4.0, max_delay=20.0, jitter=0.5)
+        def flaky():
+            calls.append(1)
+            raise ValueError("boom")
+
+        with patch('src.retry.random.uniform', side_effect=lambda low, high: low):
+            with pytest.raises(ValueError):
+                flaky()
+
+        assert len(calls) == 5
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [5.0, 10.0, 10.0, 10.0]
+
+        mock_sleep.reset_mock()
+        with patch('src.retry.random.uniform', side_effect=lambda low, high: high):
+            with pytest.raises(ValueError):
+                flaky()
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [10.0, 20.0, 20.0, 20.0]
+
+    @patch('src.retry.time.sleep')
+    def test_honors_retry_after_and_skips_client_errors(self, mock_sleep):
+        """Test que se respeta Retry-After en 429 y no se reintentan errores 4xx definitivos."""
+        def _http_error(status, headers=None):
+            error = Exception(f"HTTP {status}")
+            error.response = MagicMock(status_code=status, headers=headers or {})
+            return error
+
+        attempts = []
+
+        @retry_with_backoff(max_retries=2, initial_delay=1.0, jitter=0)
+        def rate_limited():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise _http_error(429, {'Retry-After': '7'})
+            return 'ok'
+
+        @retry_with_backoff(max_retries=2, initial_delay=1.0, jitter=0)
+        def not_found():
+            raise _http_error(404)
+
+        assert rate_limited() == 'ok'
+        mock_sleep.assert_called_once_with(7.0)
+        mock_sleep.reset_mock()
+        with pytest.raises(Exception, match="HTTP 404"):
+            not_found()
+        mock_sleep.assert_not_called()
+
+    @patch('src.retry.time.sleep')
+    def test_ignores_responses_of_unrelated_exceptions(self, mock_sleep):
+        """Test que solo se mira la respuesta de la cadena error/__cause__, no la del __context__."""
+        attempts = []
+
+        def _http_error(status):
+            error = Exception(f"HTTP {status}")
+            error.response = MagicMock(status_code=status, headers={'Retry-After': '25'})
+            return error
+
+        @retry_with_backoff(max_retries=2, initial_delay=1.0, jitter=0)
+        def wrapped():
+            attempts.append(1)
+            if len(attempts) == 1:
+                # Envoltura explícita: se respeta el estado y el Retry-After de la causa
+                raise ConnectionError("timeout") from _http_error(503)
+            try:
+                raise _http_error(404)
+            except Exception:
+                # Error no relacionado lanzado mientras se trataba el 404
+                raise ConnectionError("reset")  # pylint: disable=raise-missing-from
+
+        with pytest.raises(ConnectionError, match="reset"):
+            wrapped()
+
+        assert len(attempts) == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [25.0, 2.0]
+
+    def test_coroutines_retry_with_asyncio_sleep(self):
+        """Test que las corrutinas decoradas esperan con asyncio.sleep y no con time.sleep."""
+        attempts = []
+
+        @retry_with_backoff(max_retries=2, initial_delay=1.0, jitter=0)
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ValueError("boom")
+            return 'ok'
+
+        with patch('src.retry.asyncio.sleep', new_callable=AsyncMock) as mock_async_sleep, \
+                patch('src.retry.time.sleep') as mock_sleep:
+            assert asyncio.run(flaky()) == 'ok'
+
+        assert [c.args[0] for c in mock_async_sleep.call_args_list] == [1.0, 2.0]
+        mock_sleep.assert_not_called()
+
+    @patch('src.retry.time.sleep')
+    def test_unrecoverable_errors_are_not_retried(self, mock_sleep):
+        """Test que las excepciones marcadas como irrecuperables se propagan al primer intento."""
+        calls = []
+
+        @retry_with_backoff(max_retries=3, unrecoverable=(GarminConnectAuthenticationError,))
+        def bad_credentials():
+            calls.append(1)
+            raise GarminConnectAuthenticationError("401")
+
+        with pytest.raises(GarminConnectAuthenticationError):
+            bad_credentials()
+
+        assert len(calls) == 1
+        mock_sleep.assert_not_called()
@@ -0,0 +1,359 @@
+"""
+Tests para el generador de reportes HTML (src/html_reporter.py).
+"""
+# pylint: disable=protected-access
+
+import base64
+import gzip
+import io
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.html_reporter import (
+    HTMLReporter, _chart_data_uri, _markdown_converter, _md_to_html, _png_data_uri, _template_env
+)
+
+
+def _render(reporter, activities, analysis, user_profile, stats, charts, config):
+    """Renderiza la plantilla en una cadena con el mismo contexto que usa generate_report."""
+    return reporter.template.render(
+        **reporter._template_context(activities, analysis, user_profile, stats, charts, config)
+    )
+
+
+def _activity(distance_km, duration_minutes, calories=None, avg_heart_rate=None, name='Run'):
+    """Crea una actividad mínima con los campos que usa el reporter."""
+    return SimpleNamespace(
+        name=name,
+        activity_type='running',
+        date='2025-11-01T08:00:00',
+        distance_km=distance_km,
+        duration_minutes=duration_minutes,
+        calories=calories,
+        avg_heart_rate=avg_heart_rate
+    )
+
+
+class TestHTMLReporter:
+    """Tests para la clase HTMLReporter."""
+
+    @pytest.fixture
+    def reporter(self, tmp_path):
+        """Fixture que crea un HTMLReporter con directorio de salida temporal."""
+        return HTMLReporter(output_dir=str(tmp_path / 'reports'))
+
+    def test_calculate_stats_without_activities(self, reporter):
+        """Test que sin actividades no se calculan estadísticas."""
+        assert reporter._calculate_stats([], []) == {}
+
+    def test_calculate_stats_totals_and_hr_average(self, reporter):
+        """Test que los totales suman todas las actividades y la FC media ignora las que no la tienen."""
+        activities = [
+            _activity(10.0, 60.0, calories=500, avg_heart_rate=150),
+            _activity(5.0, 30.0, calories=None, avg_heart_rate=None),
+            _activity(2.5, 15.0, calories=100, avg_heart_rate=130),
+        ]
+
+        stats = reporter._calculate_stats(activities, [])
+
+        assert stats['total_activities'] == 3
+        assert stats['total_distance'] == 17.5
+        assert stats['total_duration'] == 105.0
+        assert stats['total_calories'] == 600
+        assert stats['avg_hr'] == 140
+        assert stats['weight_change'] is None
+
+    def test_calculate_stats_weight_change_in_grams(self, reporter, sample_body_composition):
+        """Test que el peso en gramos se convierte a kg para calcular la variación."""
+        stats = reporter._calculate_stats([_activity(1.0, 10.0)], sample_body_composition)
+
+        assert stats['weight_start'] == sample_body_composition[0]['weight'] / 1000
+        assert stats['weight_end'] == sample_body_composition[-1]['weight'] / 1000
+
+    def test_calculate_stats_weight_skips_measures_without_weight(self, reporter):
+        """Test que la variación de peso usa la primera y la última medida con peso, en kg o gramos."""
+        body_composition = [{'weight': None}, {'weight': 80.0}, {'bmi': 24.0},
+                            {'weight': 78500}, {'weight': 0}, {}]
+
+        stats = reporter._calculate_stats([_activity(1.0, 10.0)], body_composition)
+
+        assert stats['weight_start'] == 80.0
+        assert stats['weight_end'] == 78.5
+        assert stats['weight_change'] == pytest.approx(-1.5)
+
+    def test_template_is_compiled_once(self, reporter):
+        """Test que las plantillas compiladas se reutilizan sin volver a leer ni consultar el disco."""
+        assert reporter.jinja_env.auto_reload is False
+        _render(reporter, [], 'warm-up', {}, {}, {}, {})
+
+        with patch.object(reporter.jinja_env.loader, 'get_source') as mock_get_source:
+            for _ in range(2):
+                html = _render(reporter, [], '**ok**', {'name': 'Test'}, {}, {}, {})
+
+        mock_get_source.assert_not_called()
+        assert '<strong>ok</strong>' in html
+
+    def test_embed_charts_encodes_in_chunks(self, tmp_path):
+        """Test que la codificación por bloques produce el mismo base64 que de una vez."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=True)
+        chart = tmp_path / 'chart.png'
+        payload = bytes(range(256)) * 1000 + b'tail'
+        chart.write_bytes(payload)
+
+        with patch('src.html_reporter._B64_CHUNK_SIZE', 3 * 1024), \
+                patch('src.html_reporter._TRANSCODE_MIN_BYTES', len(payload)):
+            embedded = reporter._embed_charts({'weekly': chart, 'missing': tmp_path / 'none.png'})
+            _chart_data_uri.cache_clear()
+            with patch('src.html_reporter.pybase64', None):
+                fallback = reporter._embed_charts({'weekly': chart})
+
+        expected = 'data:image/png;base64,' + base64.b64encode(payload).decode('ascii')
+        assert embedded == fallback == {'weekly': expected}
+
+    def test_embed_charts_skips_unreadable_charts(self, tmp_path):
+        """Test que un gráfico ilegible se omite sin afectar al resto."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=True)
+        good = tmp_path / 'good.png'
+        good.write_bytes(b'png')
+        unreadable = tmp_path / 'folder.png'
+        unreadable.mkdir()
+
+        embedded = reporter._embed_charts({'good': good, 'bad': unreadable})
+
+        assert list(embedded) == ['good']
+
+    def test_unchanged_charts_are_not_reencoded(self, tmp_path):
+        """Test que un gráfico sin cambios se reutiliza y uno modificado se vuelve a codificar."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=True)
+        chart = tmp_path / 'chart.png'
+        chart.write_bytes(b'first')
+
+        with patch('src.html_reporter._png_data_uri', wraps=_png_data_uri) as mock_encode:
+            first = reporter._embed_charts({'weekly': chart})
+            second = reporter._embed_charts({'weekly': chart})
+            chart.write_bytes(b'second!')
+            third = reporter._embed_charts({'weekly': chart})
+
+        assert mock_encode.call_count == 2
+        assert first == second != third
+        assert third['weekly'] == 'data:image/png;base64,' + base64.b64encode(b'second!').decode('ascii')
+
+    @pytest.mark.parametrize('embed_assets', [False, True])
+    def test_missing_charts_are_skipped_with_warning(self, tmp_path, caplog, embed_assets):
+        """Test que un gráfico inexistente se omite y se avisa en el log."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=embed_assets)
+
+        assert reporter._embed_charts({'weekly': tmp_path / 'none.png'}) == {}
+        assert 'Gráfico weekly no encontrado' in caplog.text
+
+    def test_compiled_template_is_shared_between_instances(self, reporter, tmp_path):
+        """Test que varias instancias reutilizan la misma plantilla compilada."""
+        other = HTMLReporter(output_dir=str(tmp_path / 'other'))
+
+        assert other.jinja_env is reporter.jinja_env
+        assert other.template is reporter.template
+
+    def test_markdown_conversion_is_memoized(self, reporter):
+        """Test que el mismo análisis solo se convierte de markdown a HTML una vez."""
+        analysis = '# Memo\n\n- uno\n- dos'
+
+        with patch('src.html_reporter._markdown_converter') as mock_converter:
+            mock_converter.return_value.reset.return_value.convert.return_value = '<h1>Memo</h1>'
+            first = _render(reporter, [], analysis, {}, {}, {}, {})
+            second = _render(reporter, [], analysis, {}, {}, {}, {})
+
+        mock_converter.return_value.reset.return_value.convert.assert_called_once_with(analysis)
+        assert '<h1>Memo</h1>' in first and '<h1>Memo</h1>' in second
+
+    def test_generate_report_writes_file_atomically(self, reporter):
+        """Test que el reporte se escribe completo y sin dejar archivos temporales."""
+        output_path = reporter.generate_report(
+            [], 'Análisis', {'name': 'Test'}, [], {}, {}, '20251101_120000'
+        )
+
+        assert output_path.name == 'reporte_20251101_120000.html'
+        assert 'Análisis' in output_path.read_text(encoding='utf-8')
+        assert not list(reporter.output_dir.glob('*.tmp'))
+
+    def test_generate_report_streams_same_html_as_render(self, tmp_path):
+        """Test que el volcado por fragmentos produce el mismo HTML que el renderizado completo."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'))
+        activities = [_activity(10.0, 50.0, calories=400, avg_heart_rate=140)]
+        with patch('src.html_reporter.datetime') as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = '2025-11-01 12:00:00'
+            output_path = reporter.generate_report(
+                activities, '# Título', {'name': 'Test'}, [], {}, {}, '20251101_120000'
+            )
+            stats = reporter._calculate_stats(activities, [])
+            expected = _render(reporter, activities, '# Título', {'name': 'Test'}, stats, {}, {})
+
+        assert output_path.read_bytes() == expected.encode('utf-8')
+
+    def test_generate_report_compressed(self, tmp_path):
+        """Test que con compress=True el reporte se guarda como .html.gz."""
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), compress=True)
+
+        output_path = reporter.generate_report(
+            [], 'Análisis', {'name': 'Test'}, [], {}, {}, '20251101_120000'
+        )
+
+        assert output_path.name == 'reporte_20251101_120000.html.gz'
+        assert 'Análisis' in gzip.decompress(output_path.read_bytes()).decode('utf-8')
+        assert not list(reporter.output_dir.glob('*.tmp'))
+
+    def test_generate_report_minifies_html(self, tmp_path):
+        """Test que con minify=True el reporte se guarda minificado y por defecto no."""
+        pytest.importorskip('minify_html')
+        args = ([_activity(5.0, 30.0)], '# Título', {'name': 'Test'}, [], {}, {}, '20251101_120000')
+        minified = HTMLReporter(output_dir=str(tmp_path / 'min'), embed_assets=True, minify=True).generate_report(*args)
+        plain = HTMLReporter(output_dir=str(tmp_path / 'plain'), embed_assets=True).generate_report(*args)
+
+        minified_html = minified.read_text(encoding='utf-8')
+        assert len(minified_html) < len(plain.read_text(encoding='utf-8')) * 0.8
+        assert '\n    ' not in minified_html
+        assert '<h1>Título</h1>' in minified_html and '<td>5.00</td>' in minified_html
+
+    def test_activity_table_shows_last_activities_preformatted(self, reporter):
+        """Test que la tabla muestra las 20 últimas actividades con sus valores formateados."""
+        activities = [_activity(float(i), 30.4, name=f'Act {i:02d}') for i in range(25)]
+        activities[-1].avg_heart_rate = 151
+
+        html = _render(reporter, activities, '', {}, {}, {}, {})
+
+        assert 'Act 04' not in html
+        assert 'Act 05' in html and 'Act 24' in html
+        assert '<td>24.00</td>' in html
+        assert '<td>30</td>' in html
+        assert '<td>2025-11-01</td>' in html
+        assert '<td>151</td>' in html
+
+    def test_activity_table_escapes_activity_names(self, reporter):
+        """Test que los nombres de actividad se escapan al insertarse en la tabla."""
+        html = _render(reporter, [_activity(5.0, 30.0, name='Run <b>&</b>')], '', {}, {}, {}, {})
+
+        assert '<td>Run &lt;b&gt;&amp;&lt;/b&gt;</td>' in html
+
+    def test_user_supplied_text_is_escaped(self, reporter):
+        """Test que el nombre del atleta y los datos de configuración se escapan en la plantilla."""
+        config = {'llm_provider': 'x<script>', 'llm_model': 'm"<i>'}
+        html = _render(reporter, [], '**ok**', {'name': '<b>X</b>'}, {}, {}, config)
+
+        assert '<b>X</b>' not in html and '&lt;b&gt;X&lt;/b&gt;' in html
+        assert '<script>' not in html.lower() and '<i>' not in html
+        assert '<strong>ok</strong>' in html
+
+    def test_stat_cards_are_preformatted(self, reporter):
+        """Test que las tarjetas de estadísticas muestran los valores formateados y ocultan las vacías."""
+        stats = {'total_distance': 42.195, 'total_duration': 250.0, 'total_calories': 2999.6,
+                 'avg_hr': 148.4, 'weight_change': -1.25}
+
+        html = _render(reporter, [], '', {}, stats, {}, {})
+        empty_html = _render(reporter, [], '', {}, {'avg_hr': 0, 'weight_change': 0.0}, {}, {})
+
+        for value in ('>42.20<', '>4<', '>3000<', '>148<', '>-1.2 kg<'):
+            assert value in html
+        assert '>148<' not in empty_html and ' kg<' not in empty_html
+
+    def test_markdown_is_imported_lazily(self):
+        """Test que importar el módulo no carga markdown."""
+        code = "import sys, src.html_reporter; print('markdown' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent
+        )
+
+        assert result.stdout.strip() == 'False'
+
+    def test_charts_are_linked_by_default(self, reporter, tmp_path):
+        """Test que sin embed_assets los gráficos se enlazan y los externos se copian a assets/."""
+        local_chart = reporter.output_dir / 'weekly_volume.png'
+        local_chart.write_bytes(b'png')
+        external_chart = tmp_path / 'hr_zones.png'
+        external_chart.write_bytes(b'png')
+
+        linked = reporter._embed_charts({
+            'weekly_volume': local_chart,
+            'heart_rate_zones': external_chart,
+            'missing': tmp_path / 'none.png',
+        })
+
+        assert linked == {
+            'weekly_volume': 'weekly_volume.png',
+            'heart_rate_zones': 'assets/hr_zones.png',
+        }
+        assert (reporter.output_dir / 'assets' / 'hr_zones.png').read_bytes() == b'png'
+
+    def test_styles_are_linked_by_default_and_embedded_on_request(self, reporter, tmp_path):
+        """Test que los estilos se publican una vez como CSS enlazado, o se embeben con embed_assets."""
+        linked_html = _render(reporter, [], '', {}, {}, {}, {})
+        css_files = list(reporter.output_dir.glob('report-*.css'))
+        standalone = HTMLReporter(output_dir=str(tmp_path / 'standalone'), embed_assets=True)
+        embedded_html = _render(standalone, [], '', {}, {}, {}, {})
+
+        assert [p.name for p in css_files] == [reporter.css_href]
+        assert f'<link rel="stylesheet" href="{reporter.css_href}">' in linked_html
+        assert '<style>' not in linked_html
+        assert '<style>' in embedded_html
+        assert css_files[0].read_text(encoding='utf-8') in embedded_html
+        assert not list(standalone.output_dir.glob('*.css'))
+
+    def test_markdown_converter_is_reused_between_documents(self):
+        """Test que el conversor se crea una vez y no arrastra estado entre documentos."""
+        first = _md_to_html('Texto[^1]\n\n[^1]: nota única del primer documento')
+        second = _md_to_html('Sin notas, con *énfasis*')
+
+        assert _markdown_converter() is _markdown_converter()
+        assert 'nota única' in first
+        assert 'nota única' not in second
+        assert '<em>énfasis</em>' in second
+
+    def test_large_charts_are_embedded_as_smaller_webp(self, tmp_path):
+        """Test que un gráfico grande se embebe como WebP reducido al ancho máximo."""
+        Image = pytest.importorskip('PIL.Image')
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=True)
+        chart = tmp_path / 'chart.png'
+        image = Image.effect_noise((1600, 400), 64).convert('RGB')
+        image.save(chart, format='PNG')
+
+        embedded = reporter._embed_charts({'weekly': chart})
+
+        prefix = 'data:image/webp;base64,'
+        assert embedded['weekly'].startswith(prefix)
+        webp = base64.b64decode(embedded['weekly'][len(prefix):])
+        assert len(webp) < chart.stat().st_size
+        assert webp[12:16] == b'VP8L'  # bloque de WebP sin pérdida
+        with Image.open(io.BytesIO(webp)) as decoded:
+            assert decoded.size == (1400, 350)
+
+    def test_charts_fall_back_to_png_without_webp_encoder(self, tmp_path):
+        """Test que sin codificador WebP en Pillow se embebe el PNG original."""
+        Image = pytest.importorskip('PIL.Image')
+        reporter = HTMLReporter(output_dir=str(tmp_path / 'reports'), embed_assets=True)
+        chart = tmp_path / 'chart.png'
+        Image.effect_noise((1600, 400), 64).convert('RGB').save(chart, format='PNG')
+
+        with patch.object(Image.Image, 'save', side_effect=KeyError('WEBP')):
+            embedded = reporter._embed_charts({'weekly': chart})
+
+        assert embedded['weekly'] == 'data:image/png;base64,' + base64.b64encode(chart.read_bytes()).decode('ascii')
+
+    def test_template_bytecode_is_cached_on_disk(self, tmp_path, isolated_template_bytecode_cache):
+        """Test que el bytecode de la plantilla se guarda en disco y se reutiliza en otro proceso."""
+        cache_dir = isolated_template_bytecode_cache
+        with patch('src.html_reporter.datetime') as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = '2025-11-01 12:00:00'
+            first = HTMLReporter(output_dir=str(tmp_path / 'reports'))
+            html = _render(first, [], 'Hola', {}, {}, {}, {})
+            assert list(cache_dir.glob('__jinja2_*.cache'))
+
+            # Un entorno nuevo (como en otra ejecución) carga la plantilla desde la caché
+            _template_env.cache_clear()
+            with patch.object(_template_env(str(Path(first.template.filename).parent)),
+                              '_compile', side_effect=AssertionError('recompiled')):
+                second = HTMLReporter(output_dir=str(tmp_path / 'reports'))
+            assert _render(second, [], 'Hola', {}, {}, {}, {}) == html
@@ -96,15 +96,16 @@ class AnalysisConfig:
         """Carga configuracion desde variables de entorno."""
         # Obtener configuracion del LLM
         llm_config = Config.get_llm_config()
+        env_get = os.environ.get
 
         return cls(
-            garmin_email=os.getenv('GARMIN_EMAIL', ''),
-            garmin_password=os.getenv('GARMIN_PASSWORD', ''),
+            garmin_email=env_get('GARMIN_EMAIL', ''),
+            garmin_password=env_get('GARMIN_PASSWORD', ''),
             llm_provider=Config.LLM_PROVIDER,
             llm_model=llm_config.get('model', 'Unknown'),
-            analysis_days=int(os.getenv('ANALYSIS_DAYS', '7')),
-            training_plan_path=os.getenv('TRAINING_PLAN_PATH'),
-            output_dir=os.getenv('OUTPUT_DIR', 'analysis_reports')
+            analysis_days=int(env_get('ANALYSIS_DAYS', '7')),
+            training_plan_path=env_get('TRAINING_PLAN_PATH'),
+            output_dir=env_get('OUTPUT_DIR', 'analysis_reports')
         )
 
     def validate(self) -> bool:
@@ -176,8 +177,8 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
 
 
         # Inicializar componentes con configuración de caché
-        use_cache = os.getenv('USE_CACHE', 'true').lower() == 'true'
-        cache_ttl_hours = int(os.getenv('CACHE_TTL_HOURS', '24'))
+        use_cache = os.environ.get('USE_CACHE', 'true').lower() == 'true'
+        cache_ttl_hours = int(os.environ.get('CACHE_TTL_HOURS', '24'))
 
         self.garmin_client = GarminClient(
             config.garmin_email,
@@ -257,11 +258,11 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
         self.logger.info("%d actividades obtenidas", len(activities))
 
         # 4. Obtener detalles completos de cada actividad
-        activities_details = []
         self.logger.info("Obteniendo detalles de actividades...")
-        for activity in activities:
-            details = self.garmin_client.get_activity_details(activity.activity_id)
-            activities_details.append(details if details else {})
+        details_by_id = self.garmin_client.get_activity_details_bulk(
+            [activity.activity_id for activity in activities]
+        )
+        activities_details = [details_by_id.get(activity.activity_id) or {} for activity in activities]
 
         # 5. Obtener perfil de usuario
         user_profile = self.garmin_client.get_user_profile()
@@ -455,12 +456,14 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
             # Iterar sobre cada día del rango
             current_date = start_date
             while current_date <= end_date:
+                day = current_date.date().isoformat()
+
                 # Obtener sueño
                 if hasattr(self.garmin_client, 'get_sleep_data'):
                     sleep_data = self.garmin_client.get_sleep_data(current_date)  # pylint: disable=no-member
                     if sleep_data:
                         wellness_data['sleep'].append({
-                            'date': current_date.strftime('%Y-%m-%d'),
+                            'date': day,
                             'data': sleep_data
                         })
 
@@ -469,7 +472,7 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
                     readiness_data = self.garmin_client.get_training_readiness(current_date)  # pylint: disable=no-member
                     if readiness_data:
                         wellness_data['readiness'].append({
-                            'date': current_date.strftime('%Y-%m-%d'),
+                            'date': day,
                             'data': readiness_data
                         })
 
@@ -478,21 +481,22 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
                     training_status = self.garmin_client.get_training_status(current_date)  # pylint: disable=no-member
                     if training_status:
                         wellness_data['training_status'].append({
-                            'date': current_date.strftime('%Y-%m-%d'),
+                            'date': day,
                             'data': training_status
                         })
 
                 current_date += timedelta(days=1)
 
             # Log de resultados
-            self.logger.info(f"Metricas recopiladas - Sleep: {len(wellness_data['sleep'])}, "
-                           f"Readiness: {len(wellness_data['readiness'])}, "
-                           f"Training Status: {len(wellness_data['training_status'])}")
+            self.logger.info("Metricas recopiladas - Sleep: %d, Readiness: %d, Training Status: %d",
+                             len(wellness_data['sleep']),
+                             len(wellness_data['readiness']),
+                             len(wellness_data['training_status']))
 
             return wellness_data
 
         except Exception as e:
-            self.logger.warning(f"Error recopilando métricas de bienestar: {e}")
+            self.logger.warning("Error recopilando métricas de bienestar: %s", e)
             return wellness_data
 
     def _get_model_name(self) -> str:
@@ -514,7 +518,7 @@ class TrainingAnalyzer:  # pylint: disable=too-many-instance-attributes,too-few-
             print("\nPara ver el analisis completo, abre el reporte HTML en tu navegador.")
             print("=" * 60 + "\n")
         except Exception as e:
-            self.logger.error(f"Error mostrando resumen: {e}")
+            self.logger.error("Error mostrando resumen: %s", e)
 
 
 # ========================================